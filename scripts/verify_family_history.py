@@ -1,13 +1,27 @@
 #!/usr/bin/env python3
 import json
 import os
+import re
+import select
 import socket
 import subprocess
 import sys
 import time
 import urllib.error
 import urllib.request
+from http.client import HTTPException
 from pathlib import Path
+from typing import Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import urllib3
+except ImportError:  # pragma: no cover - falls back to urllib.request
+    urllib3 = None
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -17,6 +31,23 @@ SRC_PATH = str(ROOT / "src")
 if SRC_PATH not in sys.path:
     sys.path.insert(0, SRC_PATH)
 
+EXPECTED_CATEGORIES = ("FamilyHistory", "GeneticHistory", "Allergy")
+CATEGORY_RE = re.compile("|".join(map(re.escape, EXPECTED_CATEGORIES)))
+
+DOCUMENTS_BY_ID_QUERY = "MATCH (d:Document) WHERE d.document_id IN $ids RETURN d.*"
+OBSERVATIONS_BY_ID_QUERY = "MATCH (o:Observation) WHERE o.observation_id IN $ids RETURN o.*"
+
+HTTP = (
+    urllib3.PoolManager(
+        num_pools=2,
+        maxsize=4,
+        timeout=urllib3.Timeout(connect=2.0, read=10.0),
+    )
+    if urllib3 is not None
+    else None
+)
+HTTP_ERRORS = (urllib3.exceptions.HTTPError,) if urllib3 is not None else (OSError, HTTPException)
+
 
 def load_env(path: Path) -> None:
     if not path.exists():
@@ -29,35 +60,85 @@ def load_env(path: Path) -> None:
         os.environ.setdefault(key.strip(), value.strip())
 
 
+def http_request(
+    method: str, url: str, body: Optional[bytes] = None, timeout_seconds: float = 10.0
+) -> Tuple[int, bytes]:
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    if HTTP is not None:
+        response = HTTP.request(
+            method,
+            url,
+            body=body,
+            headers=headers,
+            timeout=urllib3.Timeout(connect=2.0, read=timeout_seconds),
+            retries=False,
+        )
+        return response.status, response.data
+    request = urllib.request.Request(url, data=body, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
 def port_in_use(host: str, port: int) -> bool:
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        sock.settimeout(1.0)
-        return sock.connect_ex((host, port)) == 0
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((host, port))
+        except OSError:
+            return True
+        return False
 
 
-def wait_for_health(url: str, timeout_seconds: int = 30) -> bool:
+def wait_for_health(
+    url: str, timeout_seconds: int = 30, proc: Optional[subprocess.Popen] = None
+) -> bool:
     deadline = time.time() + timeout_seconds
-    while time.time() < deadline:
+    delay = 0.05
+    pidfd = None
+    if proc is not None and hasattr(os, "pidfd_open"):
         try:
-            with urllib.request.urlopen(url, timeout=2) as response:
-                if response.status == 200:
+            pidfd = os.pidfd_open(proc.pid)
+        except OSError:
+            pidfd = None
+    try:
+        while time.time() < deadline:
+            try:
+                status, _ = http_request("GET", url, timeout_seconds=2.0)
+                if status == 200:
                     return True
-        except Exception:
-            time.sleep(1)
-    return False
+            except HTTP_ERRORS:
+                pass
+            if pidfd is not None:
+                # Back off, but wake immediately if the server process exits.
+                readable, _, _ = select.select([pidfd], [], [], delay)
+                if readable:
+                    return False
+            else:
+                if proc is not None and proc.poll() is not None:
+                    return False
+                time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+        return False
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
 
 
 def post_json(url: str, payload: dict, timeout_seconds: int = 120) -> dict:
-    body = json.dumps(payload).encode("utf-8")
-    request = urllib.request.Request(
-        url,
-        data=body,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
-        raw = response.read().decode("utf-8")
-    return json.loads(raw)
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload).encode("utf-8")
+    status, data = http_request("POST", url, body=body, timeout_seconds=timeout_seconds)
+    if status >= 400:
+        detail = data.decode("utf-8", errors="replace")
+        raise RuntimeError(f"HTTP {status}: {detail}")
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def stop_process(proc: subprocess.Popen, timeout_seconds: int = 10) -> None:
@@ -123,7 +204,7 @@ def main() -> int:
         )
 
     try:
-        if not wait_for_health(f"http://{host}:{port}/health", timeout_seconds=60):
+        if not wait_for_health(f"http://{host}:{port}/health", timeout_seconds=60, proc=proc):
             print(f"Backend failed to start. See log: {log_path}")
             return 1
 
@@ -147,9 +228,8 @@ def main() -> int:
         if response.get("status") != "success":
             print(f"Upload failed: {response}")
             return 1
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="replace")
-        print(f"Upload failed: {detail}")
+    except RuntimeError as exc:
+        print(f"Upload failed: {exc}")
         return 1
     finally:
         stop_process(proc)
@@ -162,28 +242,47 @@ def main() -> int:
         print(f"Missing dependencies for verification: {exc}")
         return 1
 
-    client = QdrantClient(path=str(qdrant_path))
-    points, _ = client.scroll(
-        collection_name="jkmem_memories",
-        scroll_filter=Filter(
+    qdrant_url = os.getenv("JKMEM_QDRANT_URL")
+    if qdrant_url:
+        client = QdrantClient(
+            url=qdrant_url,
+            api_key=os.getenv("JKMEM_QDRANT_API_KEY"),
+            prefer_grpc=True,
+            grpc_port=int(os.getenv("JKMEM_QDRANT_GRPC_PORT", "6334")),
+            timeout=60,
+        )
+    else:
+        client = QdrantClient(path=str(qdrant_path))
+
+    def iter_points(batch: int = 16):
+        scroll_filter = Filter(
             must=[FieldCondition(key="user_id", match=MatchValue(value=user_id))]
-        ),
-        limit=200,
-        with_payload=True,
-        with_vectors=False,
-    )
-    qdrant_memories = [{"id": p.id, "payload": p.payload} for p in points]
+        )
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name="jkmem_memories",
+                scroll_filter=scroll_filter,
+                limit=batch,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            yield from points
+            if offset is None:
+                break
 
-    needed = {"FamilyHistory": False, "GeneticHistory": False, "Allergy": False}
+    needed = dict.fromkeys(EXPECTED_CATEGORIES, False)
+    qdrant_memories = []
     observation_ids = []
     document_ids = []
-    for item in qdrant_memories:
-        payload = item.get("payload") or {}
+    for point in iter_points():
+        qdrant_memories.append({"id": point.id, "payload": point.payload})
+        payload = point.payload or {}
         data = payload.get("data", "") or ""
         source_id = payload.get("source_id")
-        for key in needed:
-            if f"name={key}" in data or key in data:
-                needed[key] = True
+        for key in CATEGORY_RE.findall(data):
+            needed[key] = True
         if data.startswith("ReportObservation:"):
             observation_ids.append(source_id)
         if data.startswith("ReportDocument:"):
@@ -191,39 +290,31 @@ def main() -> int:
 
     conn = kuzu.Connection(kuzu.Database(str(graph_path)))
 
-    def fetch_all(query: str, params: dict) -> list:
+    def iter_rows(query: str, params: dict):
         result = conn.execute(query, params)
-        rows = []
         columns = list(result.get_column_names()) if hasattr(result, "get_column_names") else None
         while result.has_next():
             row = result.get_next()
             if isinstance(row, dict):
-                rows.append(row)
+                yield row
             elif columns:
-                rows.append(dict(zip(columns, row)))
+                yield dict(zip(columns, row))
             else:
-                rows.append({"value": row})
-        return rows
+                yield {"value": row}
 
     kuzu_documents = []
-    for doc_id in document_ids:
-        if doc_id:
-            kuzu_documents.extend(
-                fetch_all(
-                    "MATCH (d:Document) WHERE d.document_id = $doc_id RETURN d.*",
-                    {"doc_id": doc_id},
-                )
-            )
+    doc_ids = [doc_id for doc_id in document_ids if doc_id]
+    if doc_ids:
+        kuzu_documents.extend(
+            iter_rows(DOCUMENTS_BY_ID_QUERY, {"ids": doc_ids})
+        )
 
     kuzu_observations = []
-    for obs_id in observation_ids:
-        if obs_id:
-            kuzu_observations.extend(
-                fetch_all(
-                    "MATCH (o:Observation) WHERE o.observation_id = $obs_id RETURN o.*",
-                    {"obs_id": obs_id},
-                )
-            )
+    obs_ids = [obs_id for obs_id in observation_ids if obs_id]
+    if obs_ids:
+        kuzu_observations.extend(
+            iter_rows(OBSERVATIONS_BY_ID_QUERY, {"ids": obs_ids})
+        )
 
     output = {
         "user_id": user_id,
@@ -1,50 +1,66 @@
-from typing import Any, Callable, Dict, List, Optional
+import hashlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from jkmem.cache import LruCache
 
 Message = Dict[str, str]
 
 
-def _format_memories(memories: Any) -> str:
+def _memory_results(memories: Any) -> List[Any]:
     if isinstance(memories, dict):
-        results = memories.get("results", [])
-    elif isinstance(memories, list):
-        results = memories
-    else:
-        results = []
+        return memories.get("results", [])
+    if isinstance(memories, list):
+        return memories
+    return []
+
+
+def _format_memories(memories: Any) -> str:
+    texts = (
+        (entry.get("memory") or entry.get("data") or entry.get("text"))
+        if isinstance(entry, dict)
+        else str(entry)
+        for entry in _memory_results(memories)
+    )
+    return "\n".join(f"- {text}" for text in texts if text) or "- (none)"
 
-    lines = []
-    for entry in results:
-        if isinstance(entry, dict):
-            text = entry.get("memory") or entry.get("data") or entry.get("text")
-        else:
-            text = str(entry)
-        if text:
-            lines.append(f"- {text}")
 
-    return "\n".join(lines) if lines else "- (none)"
+def _search_cache_key(message: str, user_id: str, filters: Optional[Dict[str, Any]]) -> str:
+    raw = f"{user_id}|{message}|{sorted((filters or {}).items())!r}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
 
 
 class MemoryAgent:
-    def __init__(self, memory: Any, llm_fn: Callable[[str, str], str]) -> None:
+    def __init__(
+        self,
+        memory: Any,
+        llm_fn: Callable[[str, str], str],
+        search_cache: Optional[LruCache] = None,
+        llm_stream_fn: Optional[Callable[[str, str], Iterable[str]]] = None,
+    ) -> None:
         self._memory = memory
         self._llm_fn = llm_fn
+        self._llm_stream_fn = llm_stream_fn
+        # Optional: identical (user, message, filters) lookups are served from
+        # here until the cache TTL expires, skipping the memory backend.
+        self._search_cache = search_cache
 
-    def respond(
-        self,
-        message: str,
-        user_id: str = "default",
-        *,
-        metadata: Optional[Dict[str, Any]] = None,
-        filters: Optional[Dict[str, Any]] = None,
-    ) -> Dict[str, Any]:
-        memories = self._memory.search(
-            query=message, user_id=user_id, limit=3, filters=filters or None
-        )
-        memories_text = _format_memories(memories)
-        system_prompt = (
+    def _search(self, message: str, user_id: str, filters: Optional[Dict[str, Any]]) -> Any:
+        if self._search_cache is None:
+            return self._memory.search(query=message, user_id=user_id, limit=3, filters=filters or None)
+        key = _search_cache_key(message, user_id, filters)
+        memories = self._search_cache.get(key)
+        if memories is None:
+            memories = self._memory.search(query=message, user_id=user_id, limit=3, filters=filters or None)
+            self._search_cache.set(key, memories)
+        return memories
+
+    def _system_prompt(self, memories: Any) -> str:
+        return (
             "You are a helpful agent. Use the memories when relevant.\n"
-            f"Memories:\n{memories_text}"
+            f"Memories:\n{_format_memories(memories)}"
         )
-        response = self._llm_fn(system_prompt, message)
+
+    def _remember(self, message: str, response: str, user_id: str, metadata: Optional[Dict[str, Any]]) -> None:
         self._memory.add(
             [
                 {"role": "user", "content": message},
@@ -53,7 +69,38 @@ class MemoryAgent:
             user_id=user_id,
             metadata=metadata,
         )
+
+    def respond(
+        self,
+        message: str,
+        user_id: str = "default",
+        *,
+        metadata: Optional[Dict[str, Any]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        memories = self._search(message, user_id, filters)
+        response = self._llm_fn(self._system_prompt(memories), message)
+        self._remember(message, response, user_id, metadata)
         return {
             "content": response,
-            "memories": memories.get("results", []) if isinstance(memories, dict) else memories
+            "memories": _memory_results(memories),
         }
+
+    def respond_stream(
+        self,
+        message: str,
+        user_id: str = "default",
+        *,
+        metadata: Optional[Dict[str, Any]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[str]:
+        if self._llm_stream_fn is None:
+            yield self.respond(message, user_id, metadata=metadata, filters=filters)["content"]
+            return
+        memories = self._search(message, user_id, filters)
+        chunks = []
+        for chunk in self._llm_stream_fn(self._system_prompt(memories), message):
+            chunks.append(chunk)
+            yield chunk
+        # The exchange is stored once the full reply has arrived.
+        self._remember(message, "".join(chunks), user_id, metadata)
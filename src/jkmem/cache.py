@@ -1,55 +1,181 @@
+import atexit
 import json
 import os
 import sqlite3
 import threading
 import time
-from collections import OrderedDict
+import weakref
 from typing import Any, Optional
 
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional speedup
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional compression
+    zstandard = None
+
+# Every zstd frame starts with this magic number; neither msgpack nor JSON
+# encoding of a cached value can, so compressed rows are recognisable.
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# zstd contexts must not be shared between threads.
+_zstd = threading.local()
+
+
+def _loads_json(raw: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _encode(value: Any) -> bytes:
+    if msgpack is not None:
+        return msgpack.packb(value, use_bin_type=True, default=str)
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str).encode("utf-8")
+
+
+def _compress(payload: bytes) -> bytes:
+    compressor = getattr(_zstd, "compressor", None)
+    if compressor is None:
+        compressor = _zstd.compressor = zstandard.ZstdCompressor(level=1)
+    return compressor.compress(payload)
+
+
+def _decompress(raw: bytes) -> bytes:
+    if zstandard is None:
+        raise ValueError("zstandard is required to read compressed cache entries")
+    decompressor = getattr(_zstd, "decompressor", None)
+    if decompressor is None:
+        decompressor = _zstd.decompressor = zstandard.ZstdDecompressor()
+    try:
+        return decompressor.decompress(raw)
+    except zstandard.ZstdError as exc:
+        raise ValueError(str(exc)) from exc
+
+
+def _decode(raw: Any) -> Any:
+    if isinstance(raw, str):
+        # Rows written before values were stored as BLOBs.
+        return _loads_json(raw)
+    if raw[:4] == _ZSTD_MAGIC:
+        raw = _decompress(raw)
+    if msgpack is not None:
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+    return _loads_json(raw)
+
 
 class LruCache:
     def __init__(self, capacity: int = 512, ttl_seconds: int = 300) -> None:
         self._capacity = max(1, capacity)
         self._ttl_seconds = max(0, ttl_seconds)
-        self._data: OrderedDict[str, tuple[Optional[float], Any]] = OrderedDict()
+        # Plain dicts keep insertion order; re-inserting a key marks it most recent.
+        self._data: dict[str, tuple[Optional[float], Any]] = {}
         self._lock = threading.Lock()
 
     def get(self, key: str) -> Optional[Any]:
         now = time.monotonic()
         with self._lock:
-            item = self._data.get(key)
-            if not item:
+            item = self._data.pop(key, None)
+            if item is None:
                 return None
-            expires_at, value = item
+            expires_at = item[0]
             if expires_at is not None and expires_at <= now:
-                self._data.pop(key, None)
                 return None
-            self._data.move_to_end(key)
-            return value
+            self._data[key] = item
+        return item[1]
 
     def set(self, key: str, value: Any) -> None:
         expires_at = None
         if self._ttl_seconds > 0:
             expires_at = time.monotonic() + self._ttl_seconds
         with self._lock:
+            self._data.pop(key, None)
             self._data[key] = (expires_at, value)
-            self._data.move_to_end(key)
             if len(self._data) > self._capacity:
-                self._data.popitem(last=False)
+                del self._data[next(iter(self._data))]
 
     def clear(self) -> None:
         with self._lock:
             self._data.clear()
 
 
+# Caches that may still hold buffered writes; flushed when the process exits.
+_OPEN_SQLITE_CACHES: "weakref.WeakSet[SqliteCache]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_sqlite_caches() -> None:
+    for cache in list(_OPEN_SQLITE_CACHES):
+        try:
+            cache.flush()
+        except sqlite3.Error:
+            pass
+
+
 class SqliteCache:
-    def __init__(self, path: str, ttl_seconds: int = 900) -> None:
+    _GET_SQL = """
+        SELECT cache_value, updated_at, ttl_seconds
+        FROM cache_entries
+        WHERE cache_key = ?
+    """
+    _DELETE_SQL = "DELETE FROM cache_entries WHERE cache_key = ?"
+    _CLEAR_SQL = "DELETE FROM cache_entries"
+    _UPSERT_SQL = """
+        INSERT INTO cache_entries (cache_key, cache_value, updated_at, ttl_seconds)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(cache_key) DO UPDATE SET
+            cache_value = excluded.cache_value,
+            updated_at = excluded.updated_at,
+            ttl_seconds = excluded.ttl_seconds
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = 900,
+        flush_size: int = 32,
+        flush_interval: float = 0.25,
+        compress: bool = False,
+        compress_min_bytes: int = 4096,
+    ) -> None:
         self._path = path
         self._ttl_seconds = max(0, ttl_seconds)
+        # Large values are zstd-compressed when asked to and zstandard is installed.
+        self._compress_min_bytes = max(0, compress_min_bytes) if compress and zstandard is not None else None
+        self._flush_size = max(1, flush_size)
+        self._flush_interval = max(0.0, flush_interval)
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, cached_statements=128)
         self._lock = threading.Lock()
+        # Writes are buffered by key and committed together, either once the
+        # buffer reaches flush_size or, by a one-shot timer armed on the first
+        # buffered write, flush_interval later. The timer only references the
+        # cache while a flush is due, so an idle cache holds no thread.
+        self._pending: dict[str, tuple[str, bytes, float, int]] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._configure()
         self._init_table()
+        _OPEN_SQLITE_CACHES.add(self)
+
+    def _configure(self) -> None:
+        # The cache is rebuildable, so trade the last few commits on power loss
+        # for no fsync per write.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute("PRAGMA cache_size=-20000")
+        self._conn.execute("PRAGMA cache_spill=OFF")
 
     def _init_table(self) -> None:
         with self._lock:
@@ -57,7 +183,7 @@ class SqliteCache:
                 """
                 CREATE TABLE IF NOT EXISTS cache_entries (
                     cache_key TEXT PRIMARY KEY,
-                    cache_value TEXT NOT NULL,
+                    cache_value BLOB NOT NULL,
                     updated_at REAL NOT NULL,
                     ttl_seconds INTEGER NOT NULL
                 )
@@ -68,61 +194,93 @@ class SqliteCache:
     def get(self, key: str) -> Optional[Any]:
         now = time.time()
         with self._lock:
-            cur = self._conn.execute(
-                """
-                SELECT cache_value, updated_at, ttl_seconds
-                FROM cache_entries
-                WHERE cache_key = ?
-                """,
-                (key,),
-            )
-            row = cur.fetchone()
-            if not row:
-                return None
-            value_json, updated_at, ttl_seconds = row
+            pending = self._pending.get(key)
+            if pending is not None:
+                _, raw_value, updated_at, ttl_seconds = pending
+            else:
+                row = self._conn.execute(self._GET_SQL, (key,)).fetchone()
+                if not row:
+                    return None
+                raw_value, updated_at, ttl_seconds = row
             if ttl_seconds > 0 and updated_at + ttl_seconds <= now:
-                self._conn.execute("DELETE FROM cache_entries WHERE cache_key = ?", (key,))
+                self._pending.pop(key, None)
+                self._conn.execute(self._DELETE_SQL, (key,))
                 self._conn.commit()
                 return None
-            try:
-                return json.loads(value_json)
-            except json.JSONDecodeError:
-                return None
+        try:
+            return _decode(raw_value)
+        except ValueError:
+            return None
 
     def set(self, key: str, value: Any) -> None:
-        payload = json.dumps(value, default=str)
+        payload = _encode(value)
+        if self._compress_min_bytes is not None and len(payload) > self._compress_min_bytes:
+            payload = _compress(payload)
         now = time.time()
         with self._lock:
-            self._conn.execute(
-                """
-                INSERT INTO cache_entries (cache_key, cache_value, updated_at, ttl_seconds)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(cache_key) DO UPDATE SET
-                    cache_value = excluded.cache_value,
-                    updated_at = excluded.updated_at,
-                    ttl_seconds = excluded.ttl_seconds
-                """,
-                (key, payload, now, self._ttl_seconds),
-            )
-            self._conn.commit()
+            self._pending[key] = (key, payload, now, self._ttl_seconds)
+            if len(self._pending) >= self._flush_size:
+                self._flush_locked()
+            elif self._timer is None and not self._closed:
+                self._timer = threading.Timer(self._flush_interval, self._flush_due)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_due(self) -> None:
+        with self._lock:
+            self._timer = None
+            if self._closed:
+                return
+            try:
+                self._flush_locked()
+            except sqlite3.Error:
+                # The cache is rebuildable; drop a batch that cannot be written.
+                self._pending.clear()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        self._conn.executemany(self._UPSERT_SQL, list(self._pending.values()))
+        self._conn.commit()
+        self._pending.clear()
 
     def clear(self) -> None:
         with self._lock:
-            self._conn.execute("DELETE FROM cache_entries")
+            self._pending.clear()
+            self._conn.execute(self._CLEAR_SQL)
             self._conn.commit()
 
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            try:
+                self._flush_locked()
+            finally:
+                self._closed = True
+                _OPEN_SQLITE_CACHES.discard(self)
+                self._conn.close()
+
 
 class MultiLevelCache:
     def __init__(self, l1: LruCache, l2: Optional[SqliteCache] = None) -> None:
         self._l1 = l1
         self._l2 = l2
+        # Without an L2 every lookup is a plain L1 lookup; skip the wrapper frame.
+        if l2 is None:
+            self.get = l1.get
 
     def get(self, key: str) -> Optional[Any]:
         value = self._l1.get(key)
         if value is not None:
             return value
-        if self._l2 is None:
-            return None
         value = self._l2.get(key)
         if value is not None:
             self._l1.set(key, value)
@@ -137,3 +295,8 @@ class MultiLevelCache:
         self._l1.clear()
         if self._l2 is not None:
             self._l2.clear()
+
+    def close(self) -> None:
+        self._l1.clear()
+        if self._l2 is not None:
+            self._l2.close()
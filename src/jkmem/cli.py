@@ -3,8 +3,8 @@ from typing import Any, Dict, Optional
 
 from jkmem.agent import MemoryAgent
 from jkmem.graph_store import get_graph_store
-from jkmem.llm import call_llm
-from jkmem.memory_backends import get_memory_backend
+from jkmem.llm import call_llm, close_response_cache
+from jkmem.memory_backends import get_memory_backend, reset_memory_backend
 
 
 class JkMemCli:
@@ -15,6 +15,8 @@ class JkMemCli:
         self._user_id = "default"
         self._patient_id: Optional[str] = None
         self._encounter_id: Optional[str] = None
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._filters: Optional[Dict[str, Any]] = None
 
     def run(self) -> None:
         print("JKMem CLI ready. Type /help for commands.")
@@ -34,33 +36,37 @@ class JkMemCli:
 
         if self._graph:
             self._graph.close()
+        close_memory = getattr(self._memory, "close", None)
+        if close_memory is not None:
+            close_memory()
+        reset_memory_backend()
+        close_response_cache()
 
     def _chat(self, message: str) -> None:
-        metadata = self._build_metadata()
-        filters = self._build_filters()
         response = self._agent.respond(
             message,
             user_id=self._user_id,
-            metadata=metadata,
-            filters=filters,
+            metadata=self._metadata,
+            filters=self._filters,
         )
         print(f"assistant: {response}")
 
     def _handle_command(self, line: str) -> bool:
-        tokens = shlex.split(line)
-        command = tokens[0].lower()
-        args = tokens[1:]
+        head, _, rest = line.partition(" ")
+        command = head.lower()
 
         if command in {"/exit", "/quit"}:
             return False
         if command == "/help":
             self._print_help()
             return True
-        if command == "/use":
-            return self._cmd_use(args)
         if command == "/context":
             self._print_context()
             return True
+
+        args = shlex.split(rest) if rest else []
+        if command == "/use":
+            return self._cmd_use(args)
         if command == "/search":
             self._cmd_search(args)
             return True
@@ -84,6 +90,7 @@ class JkMemCli:
             self._encounter_id = value
         else:
             print("Unknown scope. Use user|patient|encounter.")
+        self._refresh_scope()
         self._print_context()
         return True
 
@@ -145,6 +152,11 @@ class JkMemCli:
         for row in rows:
             print(row)
 
+    def _refresh_scope(self) -> None:
+        # Scope only changes through /use, so build the per-turn dicts here once.
+        self._metadata = self._build_metadata()
+        self._filters = self._build_filters()
+
     def _build_metadata(self) -> Optional[Dict[str, Any]]:
         metadata = {}
         if self._patient_id:
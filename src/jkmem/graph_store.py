@@ -1,9 +1,31 @@
+import functools
+import heapq
+import importlib.util
+import operator
 import os
+import queue
+import tempfile
+import threading
+import warnings
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
+from jkmem.cache import LruCache
 from jkmem.models import Document, Encounter, Medication, Observation, PatientProfile
 
+T = TypeVar("T")
+
+_PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+@functools.lru_cache(maxsize=None)
+def _driver(module: str) -> Any:
+    # Imported once per process, and only for the provider actually in use.
+    if importlib.util.find_spec(module) is None:
+        raise RuntimeError(f"{module} is not installed. Run `pip install {module}`.")
+    return importlib.import_module(module)
+
 
 @dataclass(frozen=True)
 class GraphConfig:
@@ -16,9 +38,15 @@ class GraphConfig:
     neo4j_database: Optional[str]
     neo4j_max_pool: int
     neo4j_acquire_timeout: int
+    neo4j_fetch_size: int
+    neo4j_routing: bool
+    kuzu_pool_size: int
 
 
+@functools.lru_cache(maxsize=1)
 def load_graph_config() -> GraphConfig:
+    # Environment is read once per process; call load_graph_config.cache_clear()
+    # after changing JKMEM_GRAPH_* / JKMEM_NEO4J_* variables.
     provider = os.getenv("JKMEM_GRAPH_PROVIDER", "kuzu")
     enabled = os.getenv("JKMEM_GRAPH_ENABLED", "1") == "1"
     kuzu_path = os.getenv("JKMEM_GRAPH_PATH", "data/graph/kuzu.db")
@@ -32,9 +60,235 @@ def load_graph_config() -> GraphConfig:
         neo4j_database=os.getenv("JKMEM_NEO4J_DATABASE"),
         neo4j_max_pool=int(os.getenv("JKMEM_NEO4J_MAX_POOL", "10")),
         neo4j_acquire_timeout=int(os.getenv("JKMEM_NEO4J_ACQUIRE_TIMEOUT", "30")),
+        neo4j_fetch_size=int(os.getenv("JKMEM_NEO4J_FETCH_SIZE", "-1")),
+        neo4j_routing=os.getenv("JKMEM_NEO4J_ROUTING", "1") == "1",
+        kuzu_pool_size=int(os.getenv("JKMEM_KUZU_POOL_SIZE", "4")),
     )
 
 
+# Each upsert MERGEs the node and links it to its parent in one statement.
+# The node write happens even when the parent MATCH finds nothing, matching the
+# old two-statement behaviour.
+_MERGE_PATIENT = """
+MERGE (p:Patient {patient_id: $patient_id})
+SET p.name = $name,
+    p.date_of_birth = $date_of_birth,
+    p.sex = $sex
+"""
+
+_UPSERT_ENCOUNTER = """
+MERGE (e:Encounter {encounter_id: $encounter_id})
+SET e.encounter_type = $encounter_type,
+    e.start_time = $start_time,
+    e.end_time = $end_time
+WITH e
+MATCH (p:Patient {patient_id: $patient_id})
+MERGE (p)-[r:HAS_ENCOUNTER]->(e)
+SET r.created_at = $created_at
+"""
+
+_MERGE_OBSERVATION = """
+MERGE (o:Observation {observation_id: $observation_id})
+SET o.category = $category,
+    o.name = $name,
+    o.value = $value,
+    o.value_numeric = $value_numeric,
+    o.unit = $unit,
+    o.observed_at = $observed_at
+"""
+
+_UPSERT_ENCOUNTER_OBSERVATION = _MERGE_OBSERVATION + """
+WITH o
+MATCH (e:Encounter {encounter_id: $encounter_id})
+MERGE (e)-[:HAS_OBSERVATION]->(o)
+"""
+
+_UPSERT_MEDICATION = """
+MERGE (m:Medication {medication_id: $medication_id})
+SET m.name = $name,
+    m.indication = $indication,
+    m.prescriber = $prescriber,
+    m.status = $status,
+    m.start_date = $start_date,
+    m.end_date = $end_date
+WITH m
+MATCH (p:Patient {patient_id: $patient_id})
+MERGE (p)-[r:TAKES_MEDICATION]->(m)
+SET r.prescribed_at = $prescribed_at,
+    r.indication = $indication
+"""
+
+_LINK_ENCOUNTER_MEDICATION = """
+MATCH (e:Encounter {encounter_id: $encounter_id}),
+      (m:Medication {medication_id: $medication_id})
+MERGE (e)-[:HAS_MEDICATION]->(m)
+"""
+
+_MERGE_DOCUMENT = """
+MERGE (d:Document {document_id: $document_id})
+SET d.doc_type = $doc_type,
+    d.title = $title,
+    d.extracted_at = $extracted_at
+"""
+
+_UPSERT_ENCOUNTER_DOCUMENT = _MERGE_DOCUMENT + """
+WITH d
+MATCH (e:Encounter {encounter_id: $encounter_id})
+MERGE (e)-[:HAS_DOCUMENT]->(d)
+"""
+
+_UPSERT_PATIENT_DOCUMENT = _MERGE_DOCUMENT + """
+WITH d
+MATCH (p:Patient {patient_id: $patient_id})
+MERGE (p)-[:HAS_DOCUMENT_DIRECT]->(d)
+"""
+
+_WRITE_QUERIES = (
+    _MERGE_PATIENT,
+    _UPSERT_ENCOUNTER,
+    _MERGE_OBSERVATION,
+    _UPSERT_ENCOUNTER_OBSERVATION,
+    _UPSERT_MEDICATION,
+    _LINK_ENCOUNTER_MEDICATION,
+    _UPSERT_ENCOUNTER_DOCUMENT,
+    _UPSERT_PATIENT_DOCUMENT,
+)
+
+
+# attrgetter pulls every plain field in one C call, so building a batch of
+# rows does not pay an attribute lookup per field per item.
+_PATIENT_FIELDS = ("patient_id", "name", "date_of_birth", "sex")
+_ENCOUNTER_FIELDS = ("encounter_id", "patient_id", "encounter_type", "start_time", "end_time")
+_OBSERVATION_FIELDS = (
+    "observation_id",
+    "encounter_id",
+    "name",
+    "value",
+    "value_numeric",
+    "unit",
+    "observed_at",
+)
+_MEDICATION_FIELDS = (
+    "medication_id",
+    "patient_id",
+    "encounter_id",
+    "name",
+    "indication",
+    "prescriber",
+    "start_date",
+    "end_date",
+)
+_DOCUMENT_FIELDS = ("document_id", "patient_id", "encounter_id", "title", "extracted_at")
+
+_patient_fields = operator.attrgetter(*_PATIENT_FIELDS)
+_encounter_fields = operator.attrgetter(*_ENCOUNTER_FIELDS)
+_observation_fields = operator.attrgetter(*_OBSERVATION_FIELDS)
+_medication_fields = operator.attrgetter(*_MEDICATION_FIELDS)
+_document_fields = operator.attrgetter(*_DOCUMENT_FIELDS)
+
+
+def _patient_row(profile: PatientProfile) -> Dict[str, Any]:
+    return dict(zip(_PATIENT_FIELDS, _patient_fields(profile)))
+
+
+def _encounter_row(encounter: Encounter) -> Dict[str, Any]:
+    row = dict(zip(_ENCOUNTER_FIELDS, _encounter_fields(encounter)))
+    row["created_at"] = encounter.metadata.created_at or row["start_time"]
+    return row
+
+
+def _observation_row(observation: Observation) -> Dict[str, Any]:
+    row = dict(zip(_OBSERVATION_FIELDS, _observation_fields(observation)))
+    row["category"] = observation.category.value
+    return row
+
+
+def _medication_row(medication: Medication) -> Dict[str, Any]:
+    row = dict(zip(_MEDICATION_FIELDS, _medication_fields(medication)))
+    row["status"] = medication.status.value
+    row["prescribed_at"] = row["start_date"] or medication.metadata.created_at
+    return row
+
+
+def _document_row(document: Document) -> Dict[str, Any]:
+    row = dict(zip(_DOCUMENT_FIELDS, _document_fields(document)))
+    row["doc_type"] = document.doc_type.value
+    return row
+
+
+def _without(row: Dict[str, Any], *keys: str) -> Dict[str, Any]:
+    return {key: value for key, value in row.items() if key not in keys}
+
+
+def _partition_by_encounter(
+    rows: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    linked: List[Dict[str, Any]] = []
+    direct: List[Dict[str, Any]] = []
+    for row in rows:
+        (linked if row["encounter_id"] else direct).append(row)
+    return linked, direct
+
+
+def _patient_medication_groups(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(row["patient_id"], []).append(
+            {
+                "medication_id": row["medication_id"],
+                "prescribed_at": row["prescribed_at"],
+                "indication": row["indication"],
+            }
+        )
+    return [{"patient_id": patient_id, "rows": edges} for patient_id, edges in groups.items()]
+
+
+def _encounter_record(row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if row is None:
+        return {"encounter": None, "observations": [], "medications": [], "documents": []}
+    return {
+        "encounter": row["encounter"],
+        "observations": row["observations"] or [],
+        "medications": row["medications"] or [],
+        "documents": row["documents"] or [],
+    }
+
+
+def _timeline_sort_key(row: Dict[str, Any]) -> Any:
+    event_time = row["event_time"]
+    return (event_time is not None, event_time or 0)
+
+
+_NODE_KEYS = {
+    "Patient": ("patient_id", ()),
+    "Encounter": ("encounter_id", (("Patient", "patient_id"),)),
+    "Observation": ("observation_id", (("Encounter", "encounter_id"),)),
+    "Medication": ("medication_id", (("Patient", "patient_id"), ("Encounter", "encounter_id"))),
+    "Document": ("document_id", (("Patient", "patient_id"), ("Encounter", "encounter_id"))),
+}
+
+
+class _WrittenRows:
+    # Last row MERGEd per node in this process, so re-sending an identical row
+    # can skip the round trip. A row is only remembered once every parent it
+    # links to is, otherwise a link that found no parent yet would never retry.
+    def __init__(self, capacity: int = 4096) -> None:
+        self._rows = LruCache(capacity=capacity, ttl_seconds=0)
+
+    def fresh(self, label: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        key_field = _NODE_KEYS[label][0]
+        return [row for row in rows if self._rows.get(f"{label}:{row[key_field]}") != row]
+
+    def remember(self, label: str, rows: List[Dict[str, Any]]) -> None:
+        key_field, parents = _NODE_KEYS[label]
+        for row in rows:
+            if all(
+                not row.get(field) or self._rows.get(f"{parent}:{row[field]}") is not None
+                for parent, field in parents
+            ):
+                self._rows.set(f"{label}:{row[key_field]}", row)
+
+
 class GraphStore:
     def close(self) -> None:
         return None
@@ -60,6 +314,26 @@ class GraphStore:
     def add_document(self, document: Document) -> None:
         raise NotImplementedError
 
+    def add_patients_batch(self, profiles: List[PatientProfile]) -> None:
+        for profile in profiles:
+            self.add_patient(profile)
+
+    def add_encounters_batch(self, encounters: List[Encounter]) -> None:
+        for encounter in encounters:
+            self.add_encounter(encounter)
+
+    def add_observations_batch(self, observations: List[Observation]) -> None:
+        for observation in observations:
+            self.add_observation(observation)
+
+    def add_medications_batch(self, medications: List[Medication]) -> None:
+        for medication in medications:
+            self.add_medication(medication)
+
+    def add_documents_batch(self, documents: List[Document]) -> None:
+        for document in documents:
+            self.add_document(document)
+
     def get_active_medications(self, patient_id: str) -> List[Dict[str, Any]]:
         raise NotImplementedError
 
@@ -73,279 +347,426 @@ class GraphStore:
         raise NotImplementedError
 
 
+_KUZU_NODE_TABLES = frozenset({"Patient", "Encounter", "Observation", "Medication", "Document"})
+_KUZU_REL_TABLES = frozenset(
+    {
+        "HAS_ENCOUNTER",
+        "HAS_OBSERVATION",
+        "HAS_MEDICATION",
+        "HAS_DOCUMENT",
+        "HAS_DOCUMENT_DIRECT",
+        "TAKES_MEDICATION",
+    }
+)
+_KUZU_TABLES = _KUZU_NODE_TABLES | _KUZU_REL_TABLES
+
+
+_KUZU_SCHEMA = """
+CREATE NODE TABLE IF NOT EXISTS Patient(
+    patient_id STRING,
+    name STRING,
+    date_of_birth DATE,
+    sex STRING,
+    PRIMARY KEY (patient_id)
+);
+CREATE NODE TABLE IF NOT EXISTS Encounter(
+    encounter_id STRING,
+    encounter_type STRING,
+    start_time TIMESTAMP,
+    end_time TIMESTAMP,
+    PRIMARY KEY (encounter_id)
+);
+CREATE NODE TABLE IF NOT EXISTS Observation(
+    observation_id STRING,
+    category STRING,
+    name STRING,
+    value STRING,
+    value_numeric DOUBLE,
+    unit STRING,
+    observed_at TIMESTAMP,
+    PRIMARY KEY (observation_id)
+);
+CREATE NODE TABLE IF NOT EXISTS Medication(
+    medication_id STRING,
+    name STRING,
+    indication STRING,
+    prescriber STRING,
+    status STRING,
+    start_date TIMESTAMP,
+    end_date TIMESTAMP,
+    PRIMARY KEY (medication_id)
+);
+CREATE NODE TABLE IF NOT EXISTS Document(
+    document_id STRING,
+    doc_type STRING,
+    title STRING,
+    extracted_at TIMESTAMP,
+    PRIMARY KEY (document_id)
+);
+CREATE REL TABLE IF NOT EXISTS HAS_ENCOUNTER(FROM Patient TO Encounter, created_at TIMESTAMP);
+CREATE REL TABLE IF NOT EXISTS HAS_OBSERVATION(FROM Encounter TO Observation);
+CREATE REL TABLE IF NOT EXISTS HAS_MEDICATION(FROM Encounter TO Medication);
+CREATE REL TABLE IF NOT EXISTS HAS_DOCUMENT(FROM Encounter TO Document);
+CREATE REL TABLE IF NOT EXISTS HAS_DOCUMENT_DIRECT(FROM Patient TO Document);
+CREATE REL TABLE IF NOT EXISTS TAKES_MEDICATION(FROM Patient TO Medication, prescribed_at TIMESTAMP, indication STRING);
+"""
+
+
 class KuzuGraphStore(GraphStore):
-    def __init__(self, path: str) -> None:
-        try:
-            import kuzu
-        except ImportError as exc:
-            raise RuntimeError("kuzu is not installed. Run `pip install kuzu`.") from exc
+    def __init__(self, path: str, pool_size: int = 1) -> None:
+        kuzu = _driver("kuzu")
 
         os.makedirs(os.path.dirname(path), exist_ok=True)
         self._db = kuzu.Database(path)
-        self._conn = kuzu.Connection(self._db)
+        # A kuzu Connection runs one statement at a time, so concurrent callers
+        # each check out their own connection from the pool. Kuzu still rejects
+        # a second concurrent write transaction, so writes are serialised.
+        self._write_lock = threading.Lock()
+        # Connection of the explicit transaction open on this thread, if any.
+        self._tx = threading.local()
+        self._connections = [kuzu.Connection(self._db) for _ in range(max(1, pool_size))]
+        self._pool: "queue.Queue[Any]" = queue.Queue()
+        for conn in self._connections:
+            self._pool.put(conn)
+        self._prepared: Dict[int, Dict[str, Any]] = {}
+        self._written = _WrittenRows()
         self._init_schema()
+        # Prepared statements belong to the connection that prepared them.
+        self._prepared = {
+            id(conn): self._prepare_statements(conn, _WRITE_QUERIES) for conn in self._connections
+        }
+
+    def _prepare_statements(self, conn: Any, queries: Iterable[str]) -> Dict[str, Any]:
+        if not hasattr(conn, "prepare"):
+            return {}
+        with warnings.catch_warnings():
+            # Newer kuzu releases flag prepare() as deprecated but still re-parse
+            # plain query strings on every execute().
+            warnings.simplefilter("ignore", DeprecationWarning)
+            return {query: conn.prepare(query) for query in queries}
+
+    @contextmanager
+    def _with_conn(self) -> Iterator[Any]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
 
     def _exec(self, query: str, params: Optional[dict] = None) -> None:
-        if params:
-            self._conn.execute(query, params)
+        conn = getattr(self._tx, "conn", None)
+        if conn is not None:
+            self._run(conn, query, params)
+            return
+        with self._write_lock, self._with_conn() as conn:
+            self._run(conn, query, params)
+
+    def _run(self, conn: Any, query: str, params: Optional[dict]) -> None:
+        statement = self._prepared.get(id(conn), {}).get(query)
+        if statement is not None:
+            conn.execute(statement, params or {})
+        elif params:
+            conn.execute(query, params)
         else:
-            self._conn.execute(query)
+            conn.execute(query)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # Multi-statement batch writes commit once instead of once per statement.
+        with self._write_lock, self._with_conn() as conn:
+            conn.execute("BEGIN TRANSACTION")
+            self._tx.conn = conn
+            try:
+                yield
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+            finally:
+                self._tx.conn = None
 
     def _fetch(self, query: str, params: Optional[dict] = None) -> List[Dict[str, Any]]:
-        result = self._conn.execute(query, params or {})
-        if hasattr(result, "get_as_df"):
-            df = result.get_as_df()
-            return df.to_dict(orient="records")
-        rows: List[Dict[str, Any]] = []
-        columns = []
-        if hasattr(result, "get_column_names"):
+        with self._with_conn() as conn:
+            result = conn.execute(query, params or {})
+            if _PYARROW_AVAILABLE and hasattr(result, "get_as_arrow"):
+                return result.get_as_arrow(chunk_size=1024).to_pylist()
             columns = list(result.get_column_names())
-        while result.has_next():
+            return [
+                row if isinstance(row, dict) else dict(zip(columns, row))
+                for row in result.get_all()
+            ]
+
+    def _fetch_one(self, query: str, params: Optional[dict] = None) -> Optional[Dict[str, Any]]:
+        with self._with_conn() as conn:
+            result = conn.execute(query, params or {})
+            if not result.has_next():
+                return None
             row = result.get_next()
             if isinstance(row, dict):
-                rows.append(row)
-            elif columns:
-                rows.append(dict(zip(columns, row)))
-            else:
-                rows.append({"value": row})
-        return rows
+                return row
+            return dict(zip(result.get_column_names(), row))
 
     def _init_schema(self) -> None:
-        self._exec(
-            """
-            CREATE NODE TABLE IF NOT EXISTS Patient(
-                patient_id STRING,
-                name STRING,
-                date_of_birth DATE,
-                sex STRING,
-                PRIMARY KEY (patient_id)
-            );
-            """
-        )
-        self._exec(
-            """
-            CREATE NODE TABLE IF NOT EXISTS Encounter(
-                encounter_id STRING,
-                encounter_type STRING,
-                start_time TIMESTAMP,
-                end_time TIMESTAMP,
-                PRIMARY KEY (encounter_id)
-            );
-            """
-        )
-        self._exec(
-            """
-            CREATE NODE TABLE IF NOT EXISTS Observation(
-                observation_id STRING,
-                category STRING,
-                name STRING,
-                value STRING,
-                value_numeric DOUBLE,
-                unit STRING,
-                observed_at TIMESTAMP,
-                PRIMARY KEY (observation_id)
-            );
-            """
-        )
-        self._exec(
-            """
-            CREATE NODE TABLE IF NOT EXISTS Medication(
-                medication_id STRING,
-                name STRING,
-                indication STRING,
-                prescriber STRING,
-                status STRING,
-                start_date TIMESTAMP,
-                end_date TIMESTAMP,
-                PRIMARY KEY (medication_id)
-            );
-            """
-        )
-        self._exec(
-            """
-            CREATE NODE TABLE IF NOT EXISTS Document(
-                document_id STRING,
-                doc_type STRING,
-                title STRING,
-                extracted_at TIMESTAMP,
-                PRIMARY KEY (document_id)
-            );
-            """
-        )
-        self._exec(
-            "CREATE REL TABLE IF NOT EXISTS HAS_ENCOUNTER(FROM Patient TO Encounter, created_at TIMESTAMP);"
-        )
-        self._exec("CREATE REL TABLE IF NOT EXISTS HAS_OBSERVATION(FROM Encounter TO Observation);")
-        self._exec("CREATE REL TABLE IF NOT EXISTS HAS_MEDICATION(FROM Encounter TO Medication);")
-        self._exec("CREATE REL TABLE IF NOT EXISTS HAS_DOCUMENT(FROM Encounter TO Document);")
-        self._exec("CREATE REL TABLE IF NOT EXISTS HAS_DOCUMENT_DIRECT(FROM Patient TO Document);")
-        self._exec(
-            "CREATE REL TABLE IF NOT EXISTS TAKES_MEDICATION(FROM Patient TO Medication, prescribed_at TIMESTAMP, indication STRING);"
-        )
+        # Reopening an existing database costs one catalog read instead of
+        # re-running every CREATE ... IF NOT EXISTS.
+        existing = {row["name"] for row in self._fetch("CALL show_tables() RETURN name")}
+        if _KUZU_TABLES <= existing:
+            return
+        self._exec(_KUZU_SCHEMA)
 
     def close(self) -> None:
-        if hasattr(self._conn, "close"):
-            self._conn.close()
+        for conn in self._connections:
+            if hasattr(conn, "close"):
+                conn.close()
         if hasattr(self._db, "close"):
             self._db.close()
 
     def add_patient(self, profile: PatientProfile) -> None:
-        self._exec(
-            """
-            MERGE (p:Patient {patient_id: $patient_id})
-            SET p.name = $name,
-                p.date_of_birth = $date_of_birth,
-                p.sex = $sex
-            """,
-            {
-                "patient_id": profile.patient_id,
-                "name": profile.name,
-                "date_of_birth": profile.date_of_birth,
-                "sex": profile.sex,
-            },
-        )
+        rows = self._written.fresh("Patient", [_patient_row(profile)])
+        if not rows:
+            return
+        self._exec(_MERGE_PATIENT, rows[0])
+        self._written.remember("Patient", rows)
 
     def add_encounter(self, encounter: Encounter) -> None:
-        created_at = encounter.metadata.created_at or encounter.start_time
-        self._exec(
-            """
-            MERGE (e:Encounter {encounter_id: $encounter_id})
-            SET e.encounter_type = $encounter_type,
-                e.start_time = $start_time,
-                e.end_time = $end_time
-            """,
-            {
-                "encounter_id": encounter.encounter_id,
-                "encounter_type": encounter.encounter_type,
-                "start_time": encounter.start_time,
-                "end_time": encounter.end_time,
-            },
-        )
-        self._exec(
-            """
-            MATCH (p:Patient {patient_id: $patient_id})
-            MATCH (e:Encounter {encounter_id: $encounter_id})
-            MERGE (p)-[r:HAS_ENCOUNTER]->(e)
-            SET r.created_at = $created_at
-            """,
-            {
-                "patient_id": encounter.patient_id,
-                "encounter_id": encounter.encounter_id,
-                "created_at": created_at,
-            },
-        )
+        rows = self._written.fresh("Encounter", [_encounter_row(encounter)])
+        if not rows:
+            return
+        self._exec(_UPSERT_ENCOUNTER, rows[0])
+        self._written.remember("Encounter", rows)
 
     def add_observation(self, observation: Observation) -> None:
+        rows = self._written.fresh("Observation", [_observation_row(observation)])
+        if not rows:
+            return
+        row = rows[0]
+        if row["encounter_id"]:
+            self._exec(_UPSERT_ENCOUNTER_OBSERVATION, row)
+        else:
+            self._exec(_MERGE_OBSERVATION, _without(row, "encounter_id"))
+        self._written.remember("Observation", rows)
+
+    def add_medication(self, medication: Medication) -> None:
+        rows = self._written.fresh("Medication", [_medication_row(medication)])
+        if not rows:
+            return
+        row = rows[0]
+        self._exec(_UPSERT_MEDICATION, _without(row, "encounter_id"))
+        if row["encounter_id"]:
+            self._exec(
+                _LINK_ENCOUNTER_MEDICATION,
+                {"encounter_id": row["encounter_id"], "medication_id": row["medication_id"]},
+            )
+        self._written.remember("Medication", rows)
+
+    def add_document(self, document: Document) -> None:
+        rows = self._written.fresh("Document", [_document_row(document)])
+        if not rows:
+            return
+        row = rows[0]
+        if row["encounter_id"]:
+            self._exec(_UPSERT_ENCOUNTER_DOCUMENT, _without(row, "patient_id"))
+        else:
+            self._exec(_UPSERT_PATIENT_DOCUMENT, _without(row, "encounter_id"))
+        self._written.remember("Document", rows)
+
+    def bulk_load(self, table: str, path: str) -> None:
+        # COPY FROM loads at native speed but appends instead of MERGEing: it
+        # fails on primary keys that already exist, so it is for initial loads.
+        if table not in _KUZU_TABLES:
+            raise ValueError(f"Unknown Kuzu table: {table}")
+        quoted = path.replace("\\", "\\\\").replace("'", "\\'")
+        self._exec(f"COPY {table} FROM '{quoted}'")
+
+    def bulk_load_rows(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if not _PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is not installed. Run `pip install pyarrow`.")
+        if table not in _KUZU_TABLES:
+            raise ValueError(f"Unknown Kuzu table: {table}")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow_types = {
+            "STRING": pa.string(),
+            "DATE": pa.date32(),
+            "TIMESTAMP": pa.timestamp("us"),
+            "DOUBLE": pa.float64(),
+        }
+        # COPY matches columns by position, and an all-null column would be
+        # inferred as an integer, so the file schema mirrors the table's.
+        fields = [("from", pa.string()), ("to", pa.string())] if table in _KUZU_REL_TABLES else []
+        for column in self._fetch(f"CALL table_info('{table}') RETURN name, type"):
+            fields.append((column["name"], arrow_types[column["type"]]))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, f"{table}.parquet")
+            pq.write_table(pa.Table.from_pylist(rows, schema=pa.schema(fields)), path)
+            self.bulk_load(table, path)
+
+    def add_patients_batch(self, profiles: List[PatientProfile]) -> None:
+        rows = self._written.fresh("Patient", [_patient_row(profile) for profile in profiles])
+        if not rows:
+            return
         self._exec(
             """
-            MERGE (o:Observation {observation_id: $observation_id})
-            SET o.category = $category,
-                o.name = $name,
-                o.value = $value,
-                o.value_numeric = $value_numeric,
-                o.unit = $unit,
-                o.observed_at = $observed_at
+            UNWIND $rows AS row
+            MERGE (p:Patient {patient_id: row.patient_id})
+            SET p.name = row.name,
+                p.date_of_birth = CAST(row.date_of_birth AS DATE),
+                p.sex = row.sex
             """,
-            {
-                "observation_id": observation.observation_id,
-                "category": observation.category.value,
-                "name": observation.name,
-                "value": observation.value,
-                "value_numeric": observation.value_numeric,
-                "unit": observation.unit,
-                "observed_at": observation.observed_at,
-            },
+            {"rows": rows},
+        )
+        self._written.remember("Patient", rows)
+
+    def add_encounters_batch(self, encounters: List[Encounter]) -> None:
+        rows = self._written.fresh(
+            "Encounter", [_encounter_row(encounter) for encounter in encounters]
         )
-        if observation.encounter_id:
+        if not rows:
+            return
+        with self._transaction():
+            self._exec(
+                """
+                UNWIND $rows AS row
+                MERGE (e:Encounter {encounter_id: row.encounter_id})
+                SET e.encounter_type = row.encounter_type,
+                    e.start_time = CAST(row.start_time AS TIMESTAMP),
+                    e.end_time = CAST(row.end_time AS TIMESTAMP)
+                """,
+                {"rows": rows},
+            )
             self._exec(
                 """
-                MATCH (e:Encounter {encounter_id: $encounter_id})
-                MATCH (o:Observation {observation_id: $observation_id})
-                MERGE (e)-[:HAS_OBSERVATION]->(o)
+                UNWIND $rows AS row
+                MATCH (p:Patient {patient_id: row.patient_id}),
+                      (e:Encounter {encounter_id: row.encounter_id})
+                MERGE (p)-[r:HAS_ENCOUNTER]->(e)
+                SET r.created_at = CAST(row.created_at AS TIMESTAMP)
                 """,
-                {"encounter_id": observation.encounter_id, "observation_id": observation.observation_id},
+                {"rows": rows},
             )
+        self._written.remember("Encounter", rows)
 
-    def add_medication(self, medication: Medication) -> None:
-        self._exec(
-            """
-            MERGE (m:Medication {medication_id: $medication_id})
-            SET m.name = $name,
-                m.indication = $indication,
-                m.prescriber = $prescriber,
-                m.status = $status,
-                m.start_date = $start_date,
-                m.end_date = $end_date
-            """,
-            {
-                "medication_id": medication.medication_id,
-                "name": medication.name,
-                "indication": medication.indication,
-                "prescriber": medication.prescriber,
-                "status": medication.status.value,
-                "start_date": medication.start_date,
-                "end_date": medication.end_date,
-            },
+    def add_observations_batch(self, observations: List[Observation]) -> None:
+        rows = self._written.fresh(
+            "Observation", [_observation_row(observation) for observation in observations]
         )
-        if medication.encounter_id:
+        if not rows:
+            return
+        with self._transaction():
             self._exec(
                 """
-                MATCH (e:Encounter {encounter_id: $encounter_id})
-                MATCH (m:Medication {medication_id: $medication_id})
-                MERGE (e)-[:HAS_MEDICATION]->(m)
+                UNWIND $rows AS row
+                MERGE (o:Observation {observation_id: row.observation_id})
+                SET o.category = row.category,
+                    o.name = row.name,
+                    o.value = row.value,
+                    o.value_numeric = CAST(row.value_numeric AS DOUBLE),
+                    o.unit = row.unit,
+                    o.observed_at = CAST(row.observed_at AS TIMESTAMP)
                 """,
-                {"encounter_id": medication.encounter_id, "medication_id": medication.medication_id},
+                {"rows": rows},
             )
-        prescribed_at = medication.start_date or medication.metadata.created_at
-        self._exec(
-            """
-            MATCH (p:Patient {patient_id: $patient_id})
-            MATCH (m:Medication {medication_id: $medication_id})
-            MERGE (p)-[r:TAKES_MEDICATION]->(m)
-            SET r.prescribed_at = $prescribed_at,
-                r.indication = $indication
-            """,
-            {
-                "patient_id": medication.patient_id,
-                "medication_id": medication.medication_id,
-                "prescribed_at": prescribed_at,
-                "indication": medication.indication,
-            },
-        )
+            linked = [row for row in rows if row["encounter_id"]]
+            if linked:
+                self._exec(
+                    """
+                    UNWIND $rows AS row
+                    MATCH (e:Encounter {encounter_id: row.encounter_id}),
+                          (o:Observation {observation_id: row.observation_id})
+                    MERGE (e)-[:HAS_OBSERVATION]->(o)
+                    """,
+                    {"rows": linked},
+                )
+        self._written.remember("Observation", rows)
 
-    def add_document(self, document: Document) -> None:
-        self._exec(
-            """
-            MERGE (d:Document {document_id: $document_id})
-            SET d.doc_type = $doc_type,
-                d.title = $title,
-                d.extracted_at = $extracted_at
-            """,
-            {
-                "document_id": document.document_id,
-                "doc_type": document.doc_type.value,
-                "title": document.title,
-                "extracted_at": document.extracted_at,
-            },
+    def add_medications_batch(self, medications: List[Medication]) -> None:
+        rows = self._written.fresh(
+            "Medication", [_medication_row(medication) for medication in medications]
         )
-        if document.encounter_id:
+        if not rows:
+            return
+        with self._transaction():
             self._exec(
                 """
-                MATCH (e:Encounter {encounter_id: $encounter_id})
-                MATCH (d:Document {document_id: $document_id})
-                MERGE (e)-[:HAS_DOCUMENT]->(d)
+                UNWIND $rows AS row
+                MERGE (m:Medication {medication_id: row.medication_id})
+                SET m.name = row.name,
+                    m.indication = row.indication,
+                    m.prescriber = row.prescriber,
+                    m.status = row.status,
+                    m.start_date = CAST(row.start_date AS TIMESTAMP),
+                    m.end_date = CAST(row.end_date AS TIMESTAMP)
                 """,
-                {"encounter_id": document.encounter_id, "document_id": document.document_id},
+                {"rows": rows},
             )
-        else:
+            linked = [row for row in rows if row["encounter_id"]]
+            if linked:
+                self._exec(
+                    """
+                    UNWIND $rows AS row
+                    MATCH (e:Encounter {encounter_id: row.encounter_id}),
+                          (m:Medication {medication_id: row.medication_id})
+                    MERGE (e)-[:HAS_MEDICATION]->(m)
+                    """,
+                    {"rows": linked},
+                )
+            # Group edges per patient so a patient with many medications is matched
+            # once per batch rather than once per edge.
             self._exec(
                 """
-                MATCH (p:Patient {patient_id: $patient_id})
-                MATCH (d:Document {document_id: $document_id})
-                MERGE (p)-[:HAS_DOCUMENT_DIRECT]->(d)
+                UNWIND $groups AS grp
+                MATCH (p:Patient {patient_id: grp.patient_id})
+                UNWIND grp.rows AS row
+                MATCH (m:Medication {medication_id: row.medication_id})
+                MERGE (p)-[r:TAKES_MEDICATION]->(m)
+                SET r.prescribed_at = CAST(row.prescribed_at AS TIMESTAMP),
+                    r.indication = row.indication
                 """,
-                {"patient_id": document.patient_id, "document_id": document.document_id},
+                {"groups": _patient_medication_groups(rows)},
             )
+        self._written.remember("Medication", rows)
+
+    def add_documents_batch(self, documents: List[Document]) -> None:
+        rows = self._written.fresh("Document", [_document_row(document) for document in documents])
+        if not rows:
+            return
+        with self._transaction():
+            self._exec(
+                """
+                UNWIND $rows AS row
+                MERGE (d:Document {document_id: row.document_id})
+                SET d.doc_type = row.doc_type,
+                    d.title = row.title,
+                    d.extracted_at = CAST(row.extracted_at AS TIMESTAMP)
+                """,
+                {"rows": rows},
+            )
+            linked, direct = _partition_by_encounter(rows)
+            if linked:
+                self._exec(
+                    """
+                    UNWIND $rows AS row
+                    MATCH (e:Encounter {encounter_id: row.encounter_id}),
+                          (d:Document {document_id: row.document_id})
+                    MERGE (e)-[:HAS_DOCUMENT]->(d)
+                    """,
+                    {"rows": linked},
+                )
+            if direct:
+                self._exec(
+                    """
+                    UNWIND $rows AS row
+                    MATCH (p:Patient {patient_id: row.patient_id}),
+                          (d:Document {document_id: row.document_id})
+                    MERGE (p)-[:HAS_DOCUMENT_DIRECT]->(d)
+                    """,
+                    {"rows": direct},
+                )
+        self._written.remember("Document", rows)
 
     def get_active_medications(self, patient_id: str) -> List[Dict[str, Any]]:
         return self._fetch(
@@ -364,97 +785,109 @@ class KuzuGraphStore(GraphStore):
         )
 
     def get_encounter_record(self, encounter_id: str) -> Dict[str, Any]:
-        encounter_rows = self._fetch(
+        # OPTIONAL MATCH + collect() yields one all-null struct when nothing is
+        # linked, so drop those with list_filter.
+        row = self._fetch_one(
             """
             MATCH (e:Encounter {encounter_id: $encounter_id})
-            RETURN e.encounter_id AS encounter_id,
-                   e.encounter_type AS encounter_type,
-                   e.start_time AS start_time,
-                   e.end_time AS end_time
-            """,
-            {"encounter_id": encounter_id},
-        )
-        observations = self._fetch(
-            """
-            MATCH (e:Encounter {encounter_id: $encounter_id})-[:HAS_OBSERVATION]->(o:Observation)
-            RETURN o.observation_id AS observation_id,
-                   o.category AS category,
-                   o.name AS name,
-                   o.value AS value,
-                   o.value_numeric AS value_numeric,
-                   o.unit AS unit,
-                   o.observed_at AS observed_at
+            OPTIONAL MATCH (e)-[:HAS_OBSERVATION]->(o:Observation)
+            WITH e, collect({
+                observation_id: o.observation_id,
+                category: o.category,
+                name: o.name,
+                value: o.value,
+                value_numeric: o.value_numeric,
+                unit: o.unit,
+                observed_at: o.observed_at
+            }) AS observations
+            OPTIONAL MATCH (e)-[:HAS_MEDICATION]->(m:Medication)
+            WITH e, observations, collect({
+                medication_id: m.medication_id,
+                name: m.name,
+                indication: m.indication,
+                prescriber: m.prescriber,
+                status: m.status,
+                start_date: m.start_date,
+                end_date: m.end_date
+            }) AS medications
+            OPTIONAL MATCH (e)-[:HAS_DOCUMENT]->(d:Document)
+            WITH e, observations, medications, collect({
+                document_id: d.document_id,
+                doc_type: d.doc_type,
+                title: d.title,
+                extracted_at: d.extracted_at
+            }) AS documents
+            RETURN {
+                       encounter_id: e.encounter_id,
+                       encounter_type: e.encounter_type,
+                       start_time: e.start_time,
+                       end_time: e.end_time
+                   } AS encounter,
+                   list_filter(observations, x -> x.observation_id IS NOT NULL) AS observations,
+                   list_filter(medications, x -> x.medication_id IS NOT NULL) AS medications,
+                   list_filter(documents, x -> x.document_id IS NOT NULL) AS documents
             """,
             {"encounter_id": encounter_id},
         )
-        medications = self._fetch(
-            """
-            MATCH (e:Encounter {encounter_id: $encounter_id})-[:HAS_MEDICATION]->(m:Medication)
-            RETURN m.medication_id AS medication_id,
-                   m.name AS name,
-                   m.indication AS indication,
-                   m.prescriber AS prescriber,
-                   m.status AS status,
-                   m.start_date AS start_date,
-                   m.end_date AS end_date
-            """,
-            {"encounter_id": encounter_id},
-        )
-        documents = self._fetch(
-            """
-            MATCH (e:Encounter {encounter_id: $encounter_id})-[:HAS_DOCUMENT]->(d:Document)
-            RETURN d.document_id AS document_id,
-                   d.doc_type AS doc_type,
-                   d.title AS title,
-                   d.extracted_at AS extracted_at
-            """,
-            {"encounter_id": encounter_id},
-        )
-        return {
-            "encounter": encounter_rows[0] if encounter_rows else None,
-            "observations": observations,
-            "medications": medications,
-            "documents": documents,
-        }
+        return _encounter_record(row)
 
     def get_patient_timeline(self, patient_id: str, limit: int = 200) -> List[Dict[str, Any]]:
-        return self._fetch(
+        # Kuzu has no CALL {} subqueries and applies ORDER BY/LIMIT per UNION
+        # branch, so each branch keeps its newest $limit rows (dated before
+        # undated, as Kuzu sorts NULLs first under DESC) and they are merged here.
+        rows = self._fetch(
             """
             MATCH (p:Patient {patient_id: $patient_id})-[:HAS_ENCOUNTER]->(e:Encounter)
             RETURN 'encounter' AS event_type,
                    e.encounter_id AS ref_id,
                    e.start_time AS event_time
+            ORDER BY event_time IS NULL, event_time DESC
+            LIMIT $limit
             UNION ALL
             MATCH (p:Patient {patient_id: $patient_id})-[:TAKES_MEDICATION]->(m:Medication)
             RETURN 'medication' AS event_type,
                    m.medication_id AS ref_id,
                    m.start_date AS event_time
+            ORDER BY event_time IS NULL, event_time DESC
+            LIMIT $limit
             UNION ALL
             MATCH (p:Patient {patient_id: $patient_id})-[:HAS_DOCUMENT_DIRECT]->(d:Document)
             RETURN 'document' AS event_type,
                    d.document_id AS ref_id,
                    d.extracted_at AS event_time
-            ORDER BY event_time DESC
+            ORDER BY event_time IS NULL, event_time DESC
             LIMIT $limit
             """,
             {"patient_id": patient_id, "limit": limit},
         )
+        return heapq.nlargest(limit, rows, key=_timeline_sort_key)
 
     def get_medication_pairs(self, patient_id: str) -> List[Dict[str, Any]]:
         return self._fetch(
             """
-            MATCH (p:Patient {patient_id: $patient_id})-[:TAKES_MEDICATION]->(m1:Medication)
-            MATCH (p)-[:TAKES_MEDICATION]->(m2:Medication)
-            WHERE m1.medication_id < m2.medication_id
-            RETURN m1.medication_id AS medication_a_id,
-                   m1.name AS medication_a_name,
-                   m2.medication_id AS medication_b_id,
-                   m2.name AS medication_b_name
+            MATCH (p:Patient {patient_id: $patient_id})-[:TAKES_MEDICATION]->(m:Medication)
+            WITH collect({id: m.medication_id, name: m.name}) AS meds
+            UNWIND range(1, size(meds) - 1) AS i
+            UNWIND range(i + 1, size(meds)) AS j
+            WITH meds[i] AS x, meds[j] AS y
+            WITH CASE WHEN x.id < y.id THEN x ELSE y END AS a,
+                 CASE WHEN x.id < y.id THEN y ELSE x END AS b
+            RETURN a.id AS medication_a_id,
+                   a.name AS medication_a_name,
+                   b.id AS medication_b_id,
+                   b.name AS medication_b_name
             """,
             {"patient_id": patient_id},
         )
 
 
+def _record_dicts(result: Any) -> List[Dict[str, Any]]:
+    # Queries return scalars and map projections only, so the graph-type
+    # conversion Result.data() applies to every field is not needed.
+    keys = result.keys()
+    return [dict(zip(keys, record.values())) for record in result]
+
+
 class Neo4jGraphStore(GraphStore):
     def __init__(
         self,
@@ -464,29 +897,49 @@ class Neo4jGraphStore(GraphStore):
         database: Optional[str],
         max_pool_size: int,
         acquire_timeout: int,
+        fetch_size: int = -1,
     ) -> None:
-        try:
-            from neo4j import GraphDatabase
-        except ImportError as exc:
-            raise RuntimeError("neo4j is not installed. Run `pip install neo4j`.") from exc
-
-        self._driver = GraphDatabase.driver(
+        self._driver = _driver("neo4j").GraphDatabase.driver(
             url,
             auth=(username, password),
             max_connection_pool_size=max_pool_size,
             connection_acquisition_timeout=acquire_timeout,
         )
         self._database = database
+        # -1 pulls each result in one batch; the driver default streams 1000
+        # records per round trip.
+        self._fetch_size = fetch_size
+        self._written = _WrittenRows()
         self._init_schema()
 
-    def _execute(self, query: str, params: Optional[dict] = None) -> None:
-        with self._driver.session(database=self._database) as session:
+    @contextmanager
+    def _session(self) -> Iterator[Any]:
+        with self._driver.session(database=self._database, fetch_size=self._fetch_size) as session:
+            yield session
+
+    def _execute(self, query: str, params: Optional[dict] = None, tx: Any = None) -> None:
+        if tx is not None:
+            tx.run(query, params or {})
+            return
+        with self._session() as session:
             session.run(query, params or {})
 
-    def _fetch(self, query: str, params: Optional[dict] = None) -> List[Dict[str, Any]]:
-        with self._driver.session(database=self._database) as session:
-            result = session.run(query, params or {})
-            return [record.data() for record in result]
+    def _fetch(self, query: str, params: Optional[dict] = None, tx: Any = None) -> List[Dict[str, Any]]:
+        if tx is not None:
+            return _record_dicts(tx.run(query, params or {}))
+        with self._session() as session:
+            return _record_dicts(session.run(query, params or {}))
+
+    def _fetch_one(self, query: str, params: Optional[dict] = None) -> Optional[Dict[str, Any]]:
+        with self._session() as session:
+            record = session.run(query, params or {}).single()
+            if record is None:
+                return None
+            return dict(zip(record.keys(), record.values()))
+
+    def ingest_batch(self, work_fn: Callable[[Any], T]) -> T:
+        with self._session() as session:
+            return session.execute_write(work_fn)
 
     def _init_schema(self) -> None:
         self._execute("CREATE CONSTRAINT patient_id IF NOT EXISTS FOR (p:Patient) REQUIRE p.patient_id IS UNIQUE")
@@ -499,163 +952,242 @@ class Neo4jGraphStore(GraphStore):
         self._driver.close()
 
     def add_patient(self, profile: PatientProfile) -> None:
-        self._execute(
-            """
-            MERGE (p:Patient {patient_id: $patient_id})
-            SET p.name = $name,
-                p.date_of_birth = $date_of_birth,
-                p.sex = $sex
-            """,
-            {
-                "patient_id": profile.patient_id,
-                "name": profile.name,
-                "date_of_birth": profile.date_of_birth,
-                "sex": profile.sex,
-            },
-        )
+        rows = self._written.fresh("Patient", [_patient_row(profile)])
+        if not rows:
+            return
+        self._execute(_MERGE_PATIENT, rows[0])
+        self._written.remember("Patient", rows)
 
     def add_encounter(self, encounter: Encounter) -> None:
-        created_at = encounter.metadata.created_at or encounter.start_time
-        self._execute(
-            """
-            MERGE (e:Encounter {encounter_id: $encounter_id})
-            SET e.encounter_type = $encounter_type,
-                e.start_time = $start_time,
-                e.end_time = $end_time
-            """,
-            {
-                "encounter_id": encounter.encounter_id,
-                "encounter_type": encounter.encounter_type,
-                "start_time": encounter.start_time,
-                "end_time": encounter.end_time,
-            },
-        )
-        self._execute(
-            """
-            MATCH (p:Patient {patient_id: $patient_id})
-            MATCH (e:Encounter {encounter_id: $encounter_id})
-            MERGE (p)-[r:HAS_ENCOUNTER]->(e)
-            SET r.created_at = $created_at
-            """,
-            {
-                "patient_id": encounter.patient_id,
-                "encounter_id": encounter.encounter_id,
-                "created_at": created_at,
-            },
-        )
+        rows = self._written.fresh("Encounter", [_encounter_row(encounter)])
+        if not rows:
+            return
+        self._execute(_UPSERT_ENCOUNTER, rows[0])
+        self._written.remember("Encounter", rows)
 
     def add_observation(self, observation: Observation) -> None:
-        self._execute(
-            """
-            MERGE (o:Observation {observation_id: $observation_id})
-            SET o.category = $category,
-                o.name = $name,
-                o.value = $value,
-                o.value_numeric = $value_numeric,
-                o.unit = $unit,
-                o.observed_at = $observed_at
-            """,
-            {
-                "observation_id": observation.observation_id,
-                "category": observation.category.value,
-                "name": observation.name,
-                "value": observation.value,
-                "value_numeric": observation.value_numeric,
-                "unit": observation.unit,
-                "observed_at": observation.observed_at,
-            },
-        )
-        if observation.encounter_id:
+        rows = self._written.fresh("Observation", [_observation_row(observation)])
+        if not rows:
+            return
+        row = rows[0]
+        if row["encounter_id"]:
+            self._execute(_UPSERT_ENCOUNTER_OBSERVATION, row)
+        else:
+            self._execute(_MERGE_OBSERVATION, _without(row, "encounter_id"))
+        self._written.remember("Observation", rows)
+
+    def add_medication(self, medication: Medication) -> None:
+        rows = self._written.fresh("Medication", [_medication_row(medication)])
+        if not rows:
+            return
+        row = rows[0]
+        self._execute(_UPSERT_MEDICATION, _without(row, "encounter_id"))
+        if row["encounter_id"]:
+            self._execute(
+                _LINK_ENCOUNTER_MEDICATION,
+                {"encounter_id": row["encounter_id"], "medication_id": row["medication_id"]},
+            )
+        self._written.remember("Medication", rows)
+
+    def add_document(self, document: Document) -> None:
+        rows = self._written.fresh("Document", [_document_row(document)])
+        if not rows:
+            return
+        row = rows[0]
+        if row["encounter_id"]:
+            self._execute(_UPSERT_ENCOUNTER_DOCUMENT, _without(row, "patient_id"))
+        else:
+            self._execute(_UPSERT_PATIENT_DOCUMENT, _without(row, "encounter_id"))
+        self._written.remember("Document", rows)
+
+    def add_patients_batch(self, profiles: List[PatientProfile]) -> None:
+        rows = self._written.fresh("Patient", [_patient_row(profile) for profile in profiles])
+        if not rows:
+            return
+
+        def work(tx: Any) -> None:
             self._execute(
                 """
-                MATCH (e:Encounter {encounter_id: $encounter_id})
-                MATCH (o:Observation {observation_id: $observation_id})
-                MERGE (e)-[:HAS_OBSERVATION]->(o)
+                UNWIND $rows AS row
+                MERGE (p:Patient {patient_id: row.patient_id})
+                SET p.name = row.name,
+                    p.date_of_birth = row.date_of_birth,
+                    p.sex = row.sex
                 """,
-                {"encounter_id": observation.encounter_id, "observation_id": observation.observation_id},
+                {"rows": rows},
+                tx=tx,
             )
 
-    def add_medication(self, medication: Medication) -> None:
-        self._execute(
-            """
-            MERGE (m:Medication {medication_id: $medication_id})
-            SET m.name = $name,
-                m.indication = $indication,
-                m.prescriber = $prescriber,
-                m.status = $status,
-                m.start_date = $start_date,
-                m.end_date = $end_date
-            """,
-            {
-                "medication_id": medication.medication_id,
-                "name": medication.name,
-                "indication": medication.indication,
-                "prescriber": medication.prescriber,
-                "status": medication.status.value,
-                "start_date": medication.start_date,
-                "end_date": medication.end_date,
-            },
+        self.ingest_batch(work)
+        self._written.remember("Patient", rows)
+
+    def add_encounters_batch(self, encounters: List[Encounter]) -> None:
+        rows = self._written.fresh(
+            "Encounter", [_encounter_row(encounter) for encounter in encounters]
         )
-        if medication.encounter_id:
+        if not rows:
+            return
+
+        def work(tx: Any) -> None:
             self._execute(
                 """
-                MATCH (e:Encounter {encounter_id: $encounter_id})
-                MATCH (m:Medication {medication_id: $medication_id})
-                MERGE (e)-[:HAS_MEDICATION]->(m)
+                UNWIND $rows AS row
+                MERGE (e:Encounter {encounter_id: row.encounter_id})
+                SET e.encounter_type = row.encounter_type,
+                    e.start_time = row.start_time,
+                    e.end_time = row.end_time
                 """,
-                {"encounter_id": medication.encounter_id, "medication_id": medication.medication_id},
+                {"rows": rows},
+                tx=tx,
             )
-        prescribed_at = medication.start_date or medication.metadata.created_at
-        self._execute(
-            """
-            MATCH (p:Patient {patient_id: $patient_id})
-            MATCH (m:Medication {medication_id: $medication_id})
-            MERGE (p)-[r:TAKES_MEDICATION]->(m)
-            SET r.prescribed_at = $prescribed_at,
-                r.indication = $indication
-            """,
-            {
-                "patient_id": medication.patient_id,
-                "medication_id": medication.medication_id,
-                "prescribed_at": prescribed_at,
-                "indication": medication.indication,
-            },
+            self._execute(
+                """
+                UNWIND $rows AS row
+                MATCH (p:Patient {patient_id: row.patient_id}),
+                      (e:Encounter {encounter_id: row.encounter_id})
+                MERGE (p)-[r:HAS_ENCOUNTER]->(e)
+                SET r.created_at = row.created_at
+                """,
+                {"rows": rows},
+                tx=tx,
+            )
+
+        self.ingest_batch(work)
+        self._written.remember("Encounter", rows)
+
+    def add_observations_batch(self, observations: List[Observation]) -> None:
+        rows = self._written.fresh(
+            "Observation", [_observation_row(observation) for observation in observations]
         )
+        if not rows:
+            return
+        linked = [row for row in rows if row["encounter_id"]]
 
-    def add_document(self, document: Document) -> None:
-        self._execute(
-            """
-            MERGE (d:Document {document_id: $document_id})
-            SET d.doc_type = $doc_type,
-                d.title = $title,
-                d.extracted_at = $extracted_at
-            """,
-            {
-                "document_id": document.document_id,
-                "doc_type": document.doc_type.value,
-                "title": document.title,
-                "extracted_at": document.extracted_at,
-            },
+        def work(tx: Any) -> None:
+            self._execute(
+                """
+                UNWIND $rows AS row
+                MERGE (o:Observation {observation_id: row.observation_id})
+                SET o.category = row.category,
+                    o.name = row.name,
+                    o.value = row.value,
+                    o.value_numeric = row.value_numeric,
+                    o.unit = row.unit,
+                    o.observed_at = row.observed_at
+                """,
+                {"rows": rows},
+                tx=tx,
+            )
+            if linked:
+                self._execute(
+                    """
+                    UNWIND $rows AS row
+                    MATCH (e:Encounter {encounter_id: row.encounter_id}),
+                          (o:Observation {observation_id: row.observation_id})
+                    MERGE (e)-[:HAS_OBSERVATION]->(o)
+                    """,
+                    {"rows": linked},
+                    tx=tx,
+                )
+
+        self.ingest_batch(work)
+        self._written.remember("Observation", rows)
+
+    def add_medications_batch(self, medications: List[Medication]) -> None:
+        rows = self._written.fresh(
+            "Medication", [_medication_row(medication) for medication in medications]
         )
-        if document.encounter_id:
+        if not rows:
+            return
+        linked = [row for row in rows if row["encounter_id"]]
+        groups = _patient_medication_groups(rows)
+
+        def work(tx: Any) -> None:
             self._execute(
                 """
-                MATCH (e:Encounter {encounter_id: $encounter_id})
-                MATCH (d:Document {document_id: $document_id})
-                MERGE (e)-[:HAS_DOCUMENT]->(d)
+                UNWIND $rows AS row
+                MERGE (m:Medication {medication_id: row.medication_id})
+                SET m.name = row.name,
+                    m.indication = row.indication,
+                    m.prescriber = row.prescriber,
+                    m.status = row.status,
+                    m.start_date = row.start_date,
+                    m.end_date = row.end_date
                 """,
-                {"encounter_id": document.encounter_id, "document_id": document.document_id},
+                {"rows": rows},
+                tx=tx,
             )
-        else:
+            if linked:
+                self._execute(
+                    """
+                    UNWIND $rows AS row
+                    MATCH (e:Encounter {encounter_id: row.encounter_id}),
+                          (m:Medication {medication_id: row.medication_id})
+                    MERGE (e)-[:HAS_MEDICATION]->(m)
+                    """,
+                    {"rows": linked},
+                    tx=tx,
+                )
             self._execute(
                 """
-                MATCH (p:Patient {patient_id: $patient_id})
-                MATCH (d:Document {document_id: $document_id})
-                MERGE (p)-[:HAS_DOCUMENT_DIRECT]->(d)
+                UNWIND $groups AS grp
+                MATCH (p:Patient {patient_id: grp.patient_id})
+                UNWIND grp.rows AS row
+                MATCH (m:Medication {medication_id: row.medication_id})
+                MERGE (p)-[r:TAKES_MEDICATION]->(m)
+                SET r += row {.prescribed_at, .indication}
                 """,
-                {"patient_id": document.patient_id, "document_id": document.document_id},
+                {"groups": groups},
+                tx=tx,
             )
 
+        self.ingest_batch(work)
+        self._written.remember("Medication", rows)
+
+    def add_documents_batch(self, documents: List[Document]) -> None:
+        rows = self._written.fresh("Document", [_document_row(document) for document in documents])
+        if not rows:
+            return
+        linked, direct = _partition_by_encounter(rows)
+
+        def work(tx: Any) -> None:
+            self._execute(
+                """
+                UNWIND $rows AS row
+                MERGE (d:Document {document_id: row.document_id})
+                SET d.doc_type = row.doc_type,
+                    d.title = row.title,
+                    d.extracted_at = row.extracted_at
+                """,
+                {"rows": rows},
+                tx=tx,
+            )
+            if linked:
+                self._execute(
+                    """
+                    UNWIND $rows AS row
+                    MATCH (e:Encounter {encounter_id: row.encounter_id}),
+                          (d:Document {document_id: row.document_id})
+                    MERGE (e)-[:HAS_DOCUMENT]->(d)
+                    """,
+                    {"rows": linked},
+                    tx=tx,
+                )
+            if direct:
+                self._execute(
+                    """
+                    UNWIND $rows AS row
+                    MATCH (p:Patient {patient_id: row.patient_id}),
+                          (d:Document {document_id: row.document_id})
+                    MERGE (p)-[:HAS_DOCUMENT_DIRECT]->(d)
+                    """,
+                    {"rows": direct},
+                    tx=tx,
+                )
+
+        self.ingest_batch(work)
+        self._written.remember("Document", rows)
+
     def get_active_medications(self, patient_id: str) -> List[Dict[str, Any]]:
         return self._fetch(
             """
@@ -673,77 +1205,59 @@ class Neo4jGraphStore(GraphStore):
         )
 
     def get_encounter_record(self, encounter_id: str) -> Dict[str, Any]:
-        encounter_rows = self._fetch(
+        row = self._fetch_one(
             """
             MATCH (e:Encounter {encounter_id: $encounter_id})
-            RETURN e.encounter_id AS encounter_id,
-                   e.encounter_type AS encounter_type,
-                   e.start_time AS start_time,
-                   e.end_time AS end_time
-            """,
-            {"encounter_id": encounter_id},
-        )
-        observations = self._fetch(
-            """
-            MATCH (e:Encounter {encounter_id: $encounter_id})-[:HAS_OBSERVATION]->(o:Observation)
-            RETURN o.observation_id AS observation_id,
-                   o.category AS category,
-                   o.name AS name,
-                   o.value AS value,
-                   o.value_numeric AS value_numeric,
-                   o.unit AS unit,
-                   o.observed_at AS observed_at
+            OPTIONAL MATCH (e)-[:HAS_OBSERVATION]->(o:Observation)
+            WITH e, collect(o {
+                .observation_id, .category, .name, .value, .value_numeric, .unit, .observed_at
+            }) AS observations
+            OPTIONAL MATCH (e)-[:HAS_MEDICATION]->(m:Medication)
+            WITH e, observations, collect(m {
+                .medication_id, .name, .indication, .prescriber, .status, .start_date, .end_date
+            }) AS medications
+            OPTIONAL MATCH (e)-[:HAS_DOCUMENT]->(d:Document)
+            WITH e, observations, medications, collect(d {
+                .document_id, .doc_type, .title, .extracted_at
+            }) AS documents
+            RETURN e {.encounter_id, .encounter_type, .start_time, .end_time} AS encounter,
+                   observations,
+                   medications,
+                   documents
             """,
             {"encounter_id": encounter_id},
         )
-        medications = self._fetch(
-            """
-            MATCH (e:Encounter {encounter_id: $encounter_id})-[:HAS_MEDICATION]->(m:Medication)
-            RETURN m.medication_id AS medication_id,
-                   m.name AS name,
-                   m.indication AS indication,
-                   m.prescriber AS prescriber,
-                   m.status AS status,
-                   m.start_date AS start_date,
-                   m.end_date AS end_date
-            """,
-            {"encounter_id": encounter_id},
-        )
-        documents = self._fetch(
-            """
-            MATCH (e:Encounter {encounter_id: $encounter_id})-[:HAS_DOCUMENT]->(d:Document)
-            RETURN d.document_id AS document_id,
-                   d.doc_type AS doc_type,
-                   d.title AS title,
-                   d.extracted_at AS extracted_at
-            """,
-            {"encounter_id": encounter_id},
-        )
-        return {
-            "encounter": encounter_rows[0] if encounter_rows else None,
-            "observations": observations,
-            "medications": medications,
-            "documents": documents,
-        }
+        return _encounter_record(row)
 
     def get_patient_timeline(self, patient_id: str, limit: int = 200) -> List[Dict[str, Any]]:
+        # Neo4j sorts NULLs first under DESC; list undated events last, as the
+        # Kuzu store does.
         return self._fetch(
             """
-            MATCH (p:Patient {patient_id: $patient_id})-[:HAS_ENCOUNTER]->(e:Encounter)
-            RETURN 'encounter' AS event_type,
-                   e.encounter_id AS ref_id,
-                   e.start_time AS event_time
-            UNION ALL
-            MATCH (p:Patient {patient_id: $patient_id})-[:TAKES_MEDICATION]->(m:Medication)
-            RETURN 'medication' AS event_type,
-                   m.medication_id AS ref_id,
-                   m.start_date AS event_time
-            UNION ALL
-            MATCH (p:Patient {patient_id: $patient_id})-[:HAS_DOCUMENT_DIRECT]->(d:Document)
-            RETURN 'document' AS event_type,
-                   d.document_id AS ref_id,
-                   d.extracted_at AS event_time
-            ORDER BY event_time DESC
+            CALL {
+                MATCH (p:Patient {patient_id: $patient_id})-[:HAS_ENCOUNTER]->(e:Encounter)
+                RETURN 'encounter' AS event_type,
+                       e.encounter_id AS ref_id,
+                       e.start_time AS event_time
+                ORDER BY event_time IS NULL, event_time DESC
+                LIMIT $limit
+                UNION ALL
+                MATCH (p:Patient {patient_id: $patient_id})-[:TAKES_MEDICATION]->(m:Medication)
+                RETURN 'medication' AS event_type,
+                       m.medication_id AS ref_id,
+                       m.start_date AS event_time
+                ORDER BY event_time IS NULL, event_time DESC
+                LIMIT $limit
+                UNION ALL
+                MATCH (p:Patient {patient_id: $patient_id})-[:HAS_DOCUMENT_DIRECT]->(d:Document)
+                RETURN 'document' AS event_type,
+                       d.document_id AS ref_id,
+                       d.extracted_at AS event_time
+                ORDER BY event_time IS NULL, event_time DESC
+                LIMIT $limit
+            }
+            RETURN event_type, ref_id, event_time
+            ORDER BY event_time IS NULL, event_time DESC
             LIMIT $limit
             """,
             {"patient_id": patient_id, "limit": limit},
@@ -752,33 +1266,48 @@ class Neo4jGraphStore(GraphStore):
     def get_medication_pairs(self, patient_id: str) -> List[Dict[str, Any]]:
         return self._fetch(
             """
-            MATCH (p:Patient {patient_id: $patient_id})-[:TAKES_MEDICATION]->(m1:Medication)
-            MATCH (p)-[:TAKES_MEDICATION]->(m2:Medication)
-            WHERE m1.medication_id < m2.medication_id
-            RETURN m1.medication_id AS medication_a_id,
-                   m1.name AS medication_a_name,
-                   m2.medication_id AS medication_b_id,
-                   m2.name AS medication_b_name
+            MATCH (p:Patient {patient_id: $patient_id})-[:TAKES_MEDICATION]->(m:Medication)
+            WITH m ORDER BY m.medication_id
+            WITH collect(m {id: m.medication_id, name: m.name}) AS meds
+            UNWIND range(0, size(meds) - 2) AS i
+            UNWIND range(i + 1, size(meds) - 1) AS j
+            RETURN meds[i].id AS medication_a_id,
+                   meds[i].name AS medication_a_name,
+                   meds[j].id AS medication_b_id,
+                   meds[j].name AS medication_b_name
             """,
             {"patient_id": patient_id},
         )
 
 
+def _direct_neo4j_url(url: str) -> str:
+    # neo4j:// asks the driver to fetch a routing table first; a standalone
+    # server is reached directly over bolt:// with the same TLS suffix.
+    scheme, sep, rest = url.partition("://")
+    if sep and scheme.startswith("neo4j"):
+        return "bolt" + scheme[len("neo4j"):] + sep + rest
+    return url
+
+
 def get_graph_store() -> Optional[GraphStore]:
     config = load_graph_config()
     if not config.enabled:
         return None
     if config.provider == "kuzu":
-        return KuzuGraphStore(config.kuzu_path)
+        return KuzuGraphStore(config.kuzu_path, config.kuzu_pool_size)
     if config.provider == "neo4j":
         if not config.neo4j_url or not config.neo4j_username or not config.neo4j_password:
             raise RuntimeError("Missing Neo4j settings for graph store.")
+        url = config.neo4j_url
+        if not config.neo4j_routing:
+            url = _direct_neo4j_url(url)
         return Neo4jGraphStore(
-            config.neo4j_url,
+            url,
             config.neo4j_username,
             config.neo4j_password,
             config.neo4j_database,
             config.neo4j_max_pool,
             config.neo4j_acquire_timeout,
+            config.neo4j_fetch_size,
         )
     raise RuntimeError(f"Unsupported graph provider: {config.provider}")
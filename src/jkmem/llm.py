@@ -1,7 +1,24 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
 import json
 import os
 import urllib.error
 import urllib.request
+from typing import Any, Dict, Iterator, Optional
+
+from jkmem.cache import LruCache, MultiLevelCache, SqliteCache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import urllib3
+except ImportError:  # pragma: no cover - falls back to urllib.request
+    urllib3 = None
 
 
 DEFAULT_BAILIAN_BASE_URL = (
@@ -9,6 +26,43 @@ DEFAULT_BAILIAN_BASE_URL = (
 )
 DEFAULT_BAILIAN_MODEL = "qwen-plus"
 
+# Shared keep-alive pool, so repeated calls skip the TCP + TLS handshake.
+# Concurrent calls beyond the pool size wait for a free connection (up to the
+# connect timeout) instead of opening sockets that are thrown away afterwards.
+_POOL = (
+    urllib3.PoolManager(
+        num_pools=4,
+        maxsize=int(os.getenv("JKMEM_LLM_POOL_SIZE", "16")),
+        block=True,
+        # Completions are non-idempotent POSTs: retry only when the request
+        # never reached the server (connect errors) or the server turned it
+        # away without running it (429/503). Read errors, timeouts and other
+        # 5xx are not retried, since the completion may already be running
+        # and billed.
+        retries=urllib3.Retry(
+            total=2,
+            connect=2,
+            read=0,
+            other=0,
+            status=2,
+            backoff_factor=0.2,
+            status_forcelist=(429, 503),
+            allowed_methods=None,
+            raise_on_status=False,
+        ),
+    )
+    if urllib3 is not None
+    else None
+)
+# Completions are compressible JSON; urllib3 decodes every encoding it
+# advertises here (zstd/br too when zstandard/brotli are installed).
+_ACCEPT_ENCODING = urllib3.util.make_headers(accept_encoding=True) if urllib3 is not None else {}
+
+
+def close_llm_pool() -> None:
+    if _POOL is not None:
+        _POOL.clear()
+
 
 def _get_env_float(name: str, default: float) -> float:
     value = os.getenv(name)
@@ -20,20 +74,153 @@ def _get_env_float(name: str, default: float) -> float:
         raise RuntimeError(f"Invalid float value for {name}: {value}") from exc
 
 
-def call_llm(system_prompt: str, user_message: str) -> str:
-    if os.getenv("JKMEM_LLM_MODE", "").lower() == "stub":
-        return f"(stub) {user_message}"
+def _read_timeout() -> float:
+    return _get_env_float("JKMEM_LLM_READ_TIMEOUT", 60.0)
+
+
+def _timeout() -> Any:
+    return urllib3.Timeout(connect=_get_env_float("JKMEM_LLM_CONNECT_TIMEOUT", 5.0), read=_read_timeout())
+
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _post(url: str, body: bytes, headers: Dict[str, str]) -> bytes:
+    if _POOL is not None:
+        try:
+            timeout = _timeout()
+            response = _POOL.request(
+                "POST",
+                url,
+                body=body,
+                headers={**headers, **_ACCEPT_ENCODING},
+                timeout=timeout,
+                pool_timeout=timeout.connect_timeout,
+                preload_content=False,
+            )
+            try:
+                if response.status >= 400:
+                    detail = response.read(4096).decode("utf-8", errors="replace")
+                    raise RuntimeError(f"Bailian API error ({response.status}): {detail}")
+                return response.read(decode_content=True)
+            finally:
+                response.drain_conn()
+        except urllib3.exceptions.HTTPError as exc:
+            raise RuntimeError(f"Failed to reach Bailian API: {exc}") from exc
+
+    request = urllib.request.Request(url, data=body, method="POST", headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=_read_timeout()) as response:
+            return response.read()
+    except urllib.error.HTTPError as exc:
+        detail = exc.read(4096).decode("utf-8", errors="replace")
+        raise RuntimeError(f"Bailian API error ({exc.code}): {detail}") from exc
+    except urllib.error.URLError as exc:
+        raise RuntimeError(f"Failed to reach Bailian API: {exc.reason}") from exc
+
+
+def _stream_lines(url: str, body: bytes, headers: Dict[str, str]) -> Iterator[bytes]:
+    if _POOL is not None:
+        try:
+            timeout = _timeout()
+            response = _POOL.request(
+                "POST",
+                url,
+                body=body,
+                headers={**headers, **_ACCEPT_ENCODING},
+                timeout=timeout,
+                pool_timeout=timeout.connect_timeout,
+                preload_content=False,
+            )
+            finished = False
+            try:
+                if response.status >= 400:
+                    detail = response.read(4096).decode("utf-8", errors="replace")
+                    raise RuntimeError(f"Bailian API error ({response.status}): {detail}")
+                yield from response
+                finished = True
+            finally:
+                if not finished:
+                    # Abandoned or failed mid-stream: drop the socket instead of
+                    # reading the rest of the event stream.
+                    response.close()
+                response.release_conn()
+        except urllib3.exceptions.HTTPError as exc:
+            raise RuntimeError(f"Failed to reach Bailian API: {exc}") from exc
+        return
+
+    request = urllib.request.Request(url, data=body, method="POST", headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=_read_timeout()) as response:
+            yield from response
+    except urllib.error.HTTPError as exc:
+        detail = exc.read(4096).decode("utf-8", errors="replace")
+        raise RuntimeError(f"Bailian API error ({exc.code}): {detail}") from exc
+    except urllib.error.URLError as exc:
+        raise RuntimeError(f"Failed to reach Bailian API: {exc.reason}") from exc
+
+
+@functools.lru_cache(maxsize=1)
+def _response_cache() -> Optional[MultiLevelCache]:
+    if os.getenv("JKMEM_LLM_CACHE", "0") != "1":
+        return None
+    ttl = int(os.getenv("JKMEM_LLM_CACHE_TTL", "3600"))
+    l1 = LruCache(capacity=int(os.getenv("JKMEM_LLM_CACHE_CAPACITY", "4096")), ttl_seconds=ttl)
+    path = os.getenv("JKMEM_LLM_CACHE_PATH", "data/mem0/llm_cache.db")
+    return MultiLevelCache(l1, SqliteCache(path, ttl_seconds=ttl))
 
+
+def close_response_cache() -> None:
+    # Only close a cache that was actually built; the next call builds anew.
+    if _response_cache.cache_info().currsize:
+        cache = _response_cache()
+        if cache is not None:
+            cache.close()
+    _response_cache.cache_clear()
+
+
+def _response_cache_key(model: str, system_prompt: str, user_message: str) -> str:
+    raw = "\x00".join((model, system_prompt, user_message))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _api_key() -> str:
     api_key = os.getenv("JKMEM_BAILIAN_API_KEY") or os.getenv("DASHSCOPE_API_KEY")
     if not api_key:
         raise RuntimeError(
             "Missing Bailian API key. Set JKMEM_BAILIAN_API_KEY or DASHSCOPE_API_KEY."
         )
+    return api_key
+
+
+def call_llm(system_prompt: str, user_message: str) -> str:
+    if os.getenv("JKMEM_LLM_MODE", "").lower() == "stub":
+        return f"(stub) {user_message}"
+
+    api_key = _api_key()
 
     base_url = os.getenv("JKMEM_BAILIAN_BASE_URL", DEFAULT_BAILIAN_BASE_URL)
     model = os.getenv("JKMEM_BAILIAN_MODEL", DEFAULT_BAILIAN_MODEL)
     temperature = _get_env_float("JKMEM_BAILIAN_TEMPERATURE", 0.2)
 
+    # Only deterministic (temperature 0) completions are replayed from cache.
+    cache = _response_cache() if temperature <= 0 else None
+    cache_key = None
+    if cache is not None:
+        cache_key = _response_cache_key(model, system_prompt, user_message)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     payload = {
         "model": model,
         "messages": [
@@ -42,34 +229,70 @@ def call_llm(system_prompt: str, user_message: str) -> str:
         ],
         "temperature": temperature,
     }
-    body = json.dumps(payload).encode("utf-8")
+    body = _dumps(payload)
 
-    request = urllib.request.Request(
+    raw = _post(
         base_url,
-        data=body,
-        method="POST",
-        headers={
+        body,
+        {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         },
     )
 
+    data = _loads(raw)
     try:
-        with urllib.request.urlopen(request, timeout=60) as response:
-            raw = response.read().decode("utf-8")
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"Bailian API error ({exc.code}): {detail}") from exc
-    except urllib.error.URLError as exc:
-        raise RuntimeError(f"Failed to reach Bailian API: {exc.reason}") from exc
-
-    data = json.loads(raw)
-    choices = data.get("choices") or []
-    if not choices:
-        raise RuntimeError(f"Unexpected Bailian response: {data}")
-
-    message = choices[0].get("message", {})
-    content = message.get("content")
+        content = data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        # Off the happy path: work out which part of the response is missing.
+        if not data.get("choices"):
+            raise RuntimeError(f"Unexpected Bailian response: {data}") from None
+        content = None
     if not content:
         raise RuntimeError(f"Missing content in Bailian response: {data}")
+    if cache is not None:
+        cache.set(cache_key, content)
     return content
+
+
+async def acall_llm(system_prompt: str, user_message: str) -> str:
+    # The pooled client is thread-safe, so run the blocking call off the loop.
+    return await asyncio.to_thread(call_llm, system_prompt, user_message)
+
+
+def stream_llm(system_prompt: str, user_message: str) -> Iterator[str]:
+    if os.getenv("JKMEM_LLM_MODE", "").lower() == "stub":
+        yield f"(stub) {user_message}"
+        return
+
+    api_key = _api_key()
+    payload = {
+        "model": os.getenv("JKMEM_BAILIAN_MODEL", DEFAULT_BAILIAN_MODEL),
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message},
+        ],
+        "temperature": _get_env_float("JKMEM_BAILIAN_TEMPERATURE", 0.2),
+        "stream": True,
+    }
+    lines = _stream_lines(
+        os.getenv("JKMEM_BAILIAN_BASE_URL", DEFAULT_BAILIAN_BASE_URL),
+        _dumps(payload),
+        {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+        },
+    )
+    # Server-sent events: one "data: {chunk}" line per delta, then "data: [DONE]".
+    with contextlib.closing(lines):
+        for line in lines:
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            for choice in _loads(data).get("choices") or []:
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    yield content
@@ -1,21 +1,41 @@
+import os
+import sys
+
 from jkmem.agent import MemoryAgent
-from jkmem.llm import call_llm
+from jkmem.llm import call_llm, stream_llm
 from jkmem.memory_backends import get_memory_backend
 
+try:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.history import FileHistory
+except ImportError:  # pragma: no cover - plain input() without line history
+    PromptSession = None
+
+
+def _prompt_fn():
+    if PromptSession is None:
+        return input
+    session = PromptSession(history=FileHistory(os.path.expanduser("~/.jkmem_history")))
+    return session.prompt
+
 
 def main() -> None:
     memory = get_memory_backend()
-    agent = MemoryAgent(memory=memory, llm_fn=call_llm)
+    agent = MemoryAgent(memory=memory, llm_fn=call_llm, llm_stream_fn=stream_llm)
+    prompt = _prompt_fn()
 
     print("JKMem agent is running. Type 'exit' to quit.")
     while True:
-        user_input = input("You: ").strip()
+        user_input = prompt("You: ").strip()
         if user_input.lower() in {"exit", "quit"}:
             break
         if not user_input:
             continue
-        response = agent.respond(user_input)
-        print(f"Agent: {response}")
+        sys.stdout.write("Agent: ")
+        for chunk in agent.respond_stream(user_input):
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+        sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from jkmem.graph_store import GraphStore
-from jkmem.medical.utils import build_metadata
+from jkmem.medical.utils import build_metadata_fast
 from jkmem.models import Encounter, MemoryMetadata, PatientProfile, SourceType
 
 
@@ -26,21 +26,21 @@ class ConsultationService:
         summary: Optional[str] = None,
         infer: bool = True,
     ) -> Dict[str, Any]:
-        encounter = Encounter(
-            encounter_id=encounter_id,
-            patient_id=patient_id,
-            encounter_type=encounter_type,
-            start_time=start_time,
-            end_time=end_time,
-            metadata=MemoryMetadata(user_id=user_id, patient_id=patient_id, encounter_id=encounter_id),
-        )
-
+        # The Encounter model is only needed for the graph write.
         if self._graph:
+            encounter = Encounter(
+                encounter_id=encounter_id,
+                patient_id=patient_id,
+                encounter_type=encounter_type,
+                start_time=start_time,
+                end_time=end_time,
+                metadata=MemoryMetadata(user_id=user_id, patient_id=patient_id, encounter_id=encounter_id),
+            )
             profile = PatientProfile(patient_id=patient_id)
             self._graph.add_patient(profile)
             self._graph.add_encounter(encounter)
 
-        metadata = build_metadata(
+        metadata = build_metadata_fast(
             user_id=user_id,
             patient_id=patient_id,
             encounter_id=encounter_id,
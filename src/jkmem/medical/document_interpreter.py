@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Any, Dict, Optional
 
 from jkmem.graph_store import GraphStore
-from jkmem.medical.utils import build_metadata, compact_parts
+from jkmem.medical.utils import assistant_messages, build_metadata, compact_fields
 from jkmem.models import Document, SourceType
 
 
@@ -23,13 +23,11 @@ class DocumentInterpreterService:
         if self._graph:
             self._graph.add_document(document)
 
-        content = compact_parts(
-            [
-                f"doc_type={document.doc_type.value}",
-                f"title={document.title}" if document.title else None,
-                f"summary={summary}",
-                f"key_findings={key_findings}" if key_findings else None,
-            ]
+        content = compact_fields(
+            doc_type=document.doc_type.value,
+            title=document.title,
+            summary=summary,
+            key_findings=key_findings,
         )
         metadata = build_metadata(
             user_id=user_id,
@@ -39,7 +37,7 @@ class DocumentInterpreterService:
             source_id=document.document_id,
         )
         return self._memory.add(
-            [{"role": "assistant", "content": f"DocumentInterpretation: {content}"}],
+            assistant_messages("DocumentInterpretation", content),
             user_id=user_id,
             metadata=metadata,
             infer=False,
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Any, Dict, Optional
 
 from jkmem.graph_store import GraphStore
-from jkmem.medical.utils import build_metadata, compact_parts
+from jkmem.medical.utils import assistant_messages, build_metadata, compact_fields
 from jkmem.models import Document, Medication, MemoryMetadata, Observation, PatientProfile, SourceType
 
 
@@ -16,16 +16,14 @@ class HealthRecordService:
         if self._graph:
             self._graph.add_patient(profile)
 
-        summary = compact_parts(
-            [
-                f"name={profile.name}" if profile.name else None,
-                f"dob={profile.date_of_birth}" if profile.date_of_birth else None,
-                f"sex={profile.sex}" if profile.sex else None,
-                f"allergies={', '.join(profile.allergies)}" if profile.allergies else None,
-                f"conditions={', '.join(profile.conditions)}" if profile.conditions else None,
-                f"risk_factors={', '.join(profile.risk_factors)}" if profile.risk_factors else None,
-                f"summary={profile.summary}" if profile.summary else None,
-            ]
+        summary = compact_fields(
+            name=profile.name,
+            dob=profile.date_of_birth,
+            sex=profile.sex,
+            allergies=", ".join(profile.allergies),
+            conditions=", ".join(profile.conditions),
+            risk_factors=", ".join(profile.risk_factors),
+            summary=profile.summary,
         )
 
         metadata = build_metadata(
@@ -35,7 +33,7 @@ class HealthRecordService:
             source_id=profile.patient_id,
         )
         return self._memory.add(
-            [{"role": "assistant", "content": f"PatientProfile: {summary}"}],
+            assistant_messages("PatientProfile", summary),
             user_id=user_id,
             metadata=metadata,
             infer=False,
@@ -45,15 +43,13 @@ class HealthRecordService:
         if self._graph:
             self._graph.add_observation(observation)
 
-        summary = compact_parts(
-            [
-                f"category={observation.category.value}",
-                f"name={observation.name}",
-                f"value={observation.value}" if observation.value else None,
-                f"value_numeric={observation.value_numeric}" if observation.value_numeric is not None else None,
-                f"unit={observation.unit}" if observation.unit else None,
-                f"observed_at={observation.observed_at}" if observation.observed_at else None,
-            ]
+        summary = compact_fields(
+            category=observation.category.value,
+            name=observation.name,
+            value=observation.value,
+            value_numeric=observation.value_numeric,
+            unit=observation.unit,
+            observed_at=observation.observed_at,
         )
         metadata = build_metadata(
             user_id=user_id,
@@ -63,7 +59,7 @@ class HealthRecordService:
             source_id=observation.observation_id,
         )
         return self._memory.add(
-            [{"role": "assistant", "content": f"Observation: {summary}"}],
+            assistant_messages("Observation", summary),
             user_id=user_id,
             metadata=metadata,
             infer=False,
@@ -73,18 +69,16 @@ class HealthRecordService:
         if self._graph:
             self._graph.add_medication(medication)
 
-        summary = compact_parts(
-            [
-                f"name={medication.name}",
-                f"indication={medication.indication}" if medication.indication else None,
-                f"prescriber={medication.prescriber}" if medication.prescriber else None,
-                f"dose={medication.dose}" if medication.dose else None,
-                f"frequency={medication.frequency}" if medication.frequency else None,
-                f"route={medication.route}" if medication.route else None,
-                f"status={medication.status.value}",
-                f"start_date={medication.start_date}" if medication.start_date else None,
-                f"end_date={medication.end_date}" if medication.end_date else None,
-            ]
+        summary = compact_fields(
+            name=medication.name,
+            indication=medication.indication,
+            prescriber=medication.prescriber,
+            dose=medication.dose,
+            frequency=medication.frequency,
+            route=medication.route,
+            status=medication.status.value,
+            start_date=medication.start_date,
+            end_date=medication.end_date,
         )
         metadata = build_metadata(
             user_id=user_id,
@@ -94,7 +88,7 @@ class HealthRecordService:
             source_id=medication.medication_id,
         )
         return self._memory.add(
-            [{"role": "assistant", "content": f"Medication: {summary}"}],
+            assistant_messages("Medication", summary),
             user_id=user_id,
             metadata=metadata,
             infer=False,
@@ -105,14 +99,12 @@ class HealthRecordService:
             self._graph.add_document(document)
 
         doc_summary = summary or document.summary or ""
-        content = compact_parts(
-            [
-                f"doc_type={document.doc_type.value}",
-                f"title={document.title}" if document.title else None,
-                f"summary={doc_summary}" if doc_summary else None,
-                f"source_uri={document.source_uri}" if document.source_uri else None,
-                f"extracted_at={document.extracted_at}" if document.extracted_at else None,
-            ]
+        content = compact_fields(
+            doc_type=document.doc_type.value,
+            title=document.title,
+            summary=doc_summary,
+            source_uri=document.source_uri,
+            extracted_at=document.extracted_at,
         )
         metadata = build_metadata(
             user_id=user_id,
@@ -122,7 +114,7 @@ class HealthRecordService:
             source_id=document.document_id,
         )
         return self._memory.add(
-            [{"role": "assistant", "content": f"Document: {content}"}],
+            assistant_messages("Document", content),
             user_id=user_id,
             metadata=metadata,
             infer=False,
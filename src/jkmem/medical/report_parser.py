@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import os
 import re
-import uuid
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from jkmem.graph_store import GraphStore
-from jkmem.medical.utils import build_metadata, compact_parts
+from jkmem.medical.utils import assistant_messages, build_metadata_fast, compact_fields
 from jkmem.models import (
     Document,
     DocumentType,
@@ -20,6 +25,55 @@ from jkmem.models import (
 _VALUE_RE = re.compile(r"(?P<value>-?\d+(?:\.\d+)?)\s*(?P<unit>.*)")
 
 
+def _uuid7_strings(block: int = 64) -> Iterator[str]:
+    # RFC 9562 UUIDv7: a 48-bit millisecond timestamp, then a 12-bit counter
+    # that keeps ids from one generator strictly increasing, then 62 random
+    # bits. Ids from the same report sort together in downstream indexes.
+    last_ms = -1
+    counter = 0
+    while True:
+        raw = os.urandom(8 * block)
+        for offset in range(0, 8 * block, 8):
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > last_ms:
+                last_ms = now_ms
+                counter = 0
+            else:
+                counter += 1
+                if counter > 0xFFF:
+                    last_ms += 1
+                    counter = 0
+            rand = int.from_bytes(raw[offset:offset + 8], "big") & 0x3FFF_FFFF_FFFF_FFFF
+            h = f"{last_ms << 80 | 0x7 << 76 | counter << 64 | 0x2 << 62 | rand:032x}"
+            yield f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+_NON_SPACE_RE = re.compile(r"\S")
+
+_SUMMARY_CHARS = 500
+_STORE_BATCH = 64
+
+
+def _summary(report_text: str) -> Optional[str]:
+    # report_text.strip()[:500] without copying the whole (possibly huge) text.
+    if not report_text:
+        return None
+    start = _NON_SPACE_RE.search(report_text)
+    if start is None:
+        return ""
+    end = start.start() + _SUMMARY_CHARS
+    summary = report_text[start.start():end]
+    if _NON_SPACE_RE.search(report_text, end) is None:
+        summary = summary.rstrip()
+    return summary
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
 class ReportParser:
     def parse(
         self,
@@ -32,14 +86,43 @@ class ReportParser:
         source_uri: Optional[str] = None,
         extracted_at: Optional[datetime] = None,
     ) -> Tuple[Document, List[Observation]]:
-        document_id = document_id or str(uuid.uuid4())
-        observations: List[Observation] = []
+        document_id = document_id or next(_uuid7_strings(block=1))
+        observations = list(
+            self.iter_observations(
+                report_text=report_text,
+                patient_id=patient_id,
+                encounter_id=encounter_id,
+                document_id=document_id,
+                extracted_at=extracted_at,
+            )
+        )
+        document = self.build_document(
+            report_text=report_text,
+            patient_id=patient_id,
+            encounter_id=encounter_id,
+            document_id=document_id,
+            doc_type=doc_type,
+            source_uri=source_uri,
+            extracted_at=extracted_at,
+        )
+        return document, observations
 
+    def iter_observations(
+        self,
+        *,
+        report_text: str,
+        patient_id: str,
+        document_id: str,
+        encounter_id: Optional[str] = None,
+        extracted_at: Optional[datetime] = None,
+    ) -> Iterator[Observation]:
+        observation_ids = _uuid7_strings()
         for line in report_text.splitlines():
-            line = line.strip()
-            if not line or ":" not in line:
+            name, sep, raw_value = line.partition(":")
+            if not sep:
                 continue
-            name, raw_value = [part.strip() for part in line.split(":", 1)]
+            name = name.strip()
+            raw_value = raw_value.strip()
             if not name or not raw_value:
                 continue
             match = _VALUE_RE.match(raw_value)
@@ -53,34 +136,43 @@ class ReportParser:
                     value_numeric = float(value)
                 except ValueError:
                     value_numeric = None
-            observations.append(
-                Observation(
-                    observation_id=str(uuid.uuid4()),
+            # Parser output is already typed, so skip pydantic validation.
+            yield Observation.model_construct(
+                observation_id=next(observation_ids),
+                patient_id=patient_id,
+                encounter_id=encounter_id,
+                category=ObservationCategory.LAB,
+                name=name,
+                value=value,
+                value_numeric=value_numeric,
+                unit=unit,
+                observed_at=extracted_at,
+                metadata=MemoryMetadata.model_construct(
                     patient_id=patient_id,
                     encounter_id=encounter_id,
-                    category=ObservationCategory.LAB,
-                    name=name,
-                    value=value,
-                    value_numeric=value_numeric,
-                    unit=unit,
-                    observed_at=extracted_at,
-                    metadata=MemoryMetadata(
-                        patient_id=patient_id,
-                        encounter_id=encounter_id,
-                        source_type=SourceType.REPORT,
-                        source_id=document_id,
-                    ),
-                )
+                    source_type=SourceType.REPORT,
+                    source_id=document_id,
+                ),
             )
 
-        summary = report_text.strip()[:500] if report_text else None
-        document = Document(
+    def build_document(
+        self,
+        *,
+        report_text: str,
+        patient_id: str,
+        document_id: str,
+        encounter_id: Optional[str] = None,
+        doc_type: DocumentType = DocumentType.LAB,
+        source_uri: Optional[str] = None,
+        extracted_at: Optional[datetime] = None,
+    ) -> Document:
+        return Document(
             document_id=document_id,
             patient_id=patient_id,
             encounter_id=encounter_id,
             doc_type=doc_type,
             title=f"{doc_type.value} report",
-            summary=summary,
+            summary=_summary(report_text),
             source_uri=source_uri,
             extracted_at=extracted_at,
             metadata=MemoryMetadata(
@@ -91,8 +183,6 @@ class ReportParser:
             ),
         )
 
-        return document, observations
-
 
 class ReportService:
     def __init__(self, memory_backend: Any, graph_store: Optional[GraphStore] = None) -> None:
@@ -112,7 +202,8 @@ class ReportService:
         source_uri: Optional[str] = None,
         extracted_at: Optional[datetime] = None,
     ) -> Dict[str, Any]:
-        document, observations = self._parser.parse(
+        document_id = document_id or next(_uuid7_strings(block=1))
+        document = self._parser.build_document(
             report_text=report_text,
             patient_id=patient_id,
             encounter_id=encounter_id,
@@ -121,56 +212,98 @@ class ReportService:
             source_uri=source_uri,
             extracted_at=extracted_at,
         )
-
         if self._graph:
             self._graph.add_document(document)
-            for observation in observations:
-                self._graph.add_observation(observation)
 
-        stored = {"document_id": document.document_id, "observations": len(observations)}
-
-        doc_metadata = build_metadata(
+        doc_metadata = build_metadata_fast(
             user_id=user_id,
             patient_id=patient_id,
             encounter_id=encounter_id,
             source_type=SourceType.REPORT,
             source_id=document.document_id,
         )
-        doc_summary = compact_parts(
-            [
-                f"doc_type={document.doc_type.value}",
-                f"title={document.title}" if document.title else None,
-                f"summary={document.summary}" if document.summary else None,
-            ]
+        doc_summary = compact_fields(
+            doc_type=document.doc_type.value,
+            title=document.title,
+            summary=document.summary,
         )
-        self._memory.add(
-            [{"role": "assistant", "content": f"ReportDocument: {doc_summary}"}],
-            user_id=user_id,
-            metadata=doc_metadata,
-            infer=False,
+        items = [(assistant_messages("ReportDocument", doc_summary), doc_metadata)]
+
+        # Observations are parsed, written and released a batch at a time, so
+        # large reports never hold every Observation in memory at once.
+        observations = self._parser.iter_observations(
+            report_text=report_text,
+            patient_id=patient_id,
+            encounter_id=encounter_id,
+            document_id=document_id,
+            extracted_at=extracted_at,
         )
+        stored_observations = 0
+        for batch in _batched(observations, _STORE_BATCH):
+            stored_observations += len(batch)
+            if self._graph:
+                self._graph.add_observations_batch(batch)
+            for observation in batch:
+                obs_summary = compact_fields(
+                    name=observation.name,
+                    value=observation.value,
+                    value_numeric=observation.value_numeric,
+                    unit=observation.unit,
+                )
+                obs_metadata = build_metadata_fast(
+                    user_id=user_id,
+                    patient_id=patient_id,
+                    encounter_id=encounter_id,
+                    source_type=SourceType.REPORT,
+                    source_id=observation.observation_id,
+                )
+                items.append((assistant_messages("ReportObservation", obs_summary), obs_metadata))
+            self._store_memories(items, user_id)
+            items = []
+        if items:
+            self._store_memories(items, user_id)
 
-        for observation in observations:
-            obs_summary = compact_parts(
-                [
-                    f"name={observation.name}",
-                    f"value={observation.value}" if observation.value else None,
-                    f"value_numeric={observation.value_numeric}" if observation.value_numeric is not None else None,
-                    f"unit={observation.unit}" if observation.unit else None,
-                ]
-            )
-            obs_metadata = build_metadata(
+        return {"document_id": document.document_id, "observations": stored_observations}
+
+    async def aparse_and_store(
+        self,
+        *,
+        user_id: str,
+        report_text: str,
+        patient_id: str,
+        encounter_id: Optional[str] = None,
+        document_id: Optional[str] = None,
+        doc_type: DocumentType = DocumentType.LAB,
+        source_uri: Optional[str] = None,
+        extracted_at: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        # Parsing and the graph/memory writes are blocking; run the whole
+        # ingest off the event loop.
+        return await asyncio.to_thread(
+            functools.partial(
+                self.parse_and_store,
                 user_id=user_id,
+                report_text=report_text,
                 patient_id=patient_id,
                 encounter_id=encounter_id,
-                source_type=SourceType.REPORT,
-                source_id=observation.observation_id,
-            )
-            self._memory.add(
-                [{"role": "assistant", "content": f"ReportObservation: {obs_summary}"}],
-                user_id=user_id,
-                metadata=obs_metadata,
-                infer=False,
+                document_id=document_id,
+                doc_type=doc_type,
+                source_uri=source_uri,
+                extracted_at=extracted_at,
             )
+        )
+
+    def _store_memories(self, items: List[Tuple[List[Dict[str, str]], Dict[str, Any]]], user_id: str) -> None:
+        add_many = getattr(self._memory, "add_many", None)
+        if add_many is not None:
+            add_many(items, user_id=user_id, infer=False)
+            return
+
+        # Memory writes are independent round trips; overlap them. map()
+        # re-raises the first failure once the pool has shut down.
+        def add_one(item: Tuple[List[Dict[str, str]], Dict[str, Any]]) -> Any:
+            messages, metadata = item
+            return self._memory.add(messages, user_id=user_id, metadata=metadata, infer=False)
 
-        return stored
+        with ThreadPoolExecutor(max_workers=min(8, len(items))) as pool:
+            list(pool.map(add_one, items))
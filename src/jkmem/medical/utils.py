@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from jkmem.models import ActorRole, MemoryMetadata, SourceType
 
@@ -18,7 +18,8 @@ def build_metadata(
     updated_at: Optional[datetime] = None,
     extra: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    metadata = MemoryMetadata(
+    # Arguments are already typed, so skip pydantic validation.
+    metadata = MemoryMetadata.model_construct(
         user_id=user_id,
         patient_id=patient_id,
         encounter_id=encounter_id,
@@ -32,5 +33,38 @@ def build_metadata(
     return metadata.to_metadata()
 
 
+def build_metadata_fast(
+    *,
+    user_id: str,
+    patient_id: Optional[str] = None,
+    encounter_id: Optional[str] = None,
+    source_type: Optional[SourceType] = None,
+    source_id: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    # Same dict as build_metadata() for these fields, without building a model.
+    metadata = {
+        "user_id": user_id,
+        "patient_id": patient_id,
+        "encounter_id": encounter_id,
+        "source_type": source_type,
+        "source_id": source_id,
+    }
+    metadata = {key: value for key, value in metadata.items() if value is not None}
+    metadata["tags"] = []
+    if extra:
+        metadata.update(extra)
+    return metadata
+
+
 def compact_parts(parts: Iterable[Optional[str]]) -> str:
-    return "; ".join(part for part in parts if part)
+    return "; ".join(filter(None, parts))
+
+
+def compact_fields(**fields: Any) -> str:
+    # Unset fields are skipped without formatting; falsy numbers such as 0.0 are kept.
+    return "; ".join(f"{key}={value}" for key, value in fields.items() if value is not None and value != "")
+
+
+def assistant_messages(label: str, summary: str) -> List[Dict[str, str]]:
+    return [{"role": "assistant", "content": f"{label}: {summary}"}]
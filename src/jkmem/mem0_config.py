@@ -1,6 +1,7 @@
+import functools
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Set
 
 from mem0.configs.base import MemoryConfig
 from mem0.embeddings.configs import EmbedderConfig
@@ -9,6 +10,15 @@ from mem0.llms.configs import LlmConfig
 from mem0.vector_stores.configs import VectorStoreConfig
 
 
+_CREATED_PATHS: Set[str] = set()
+
+
+def _ensure_dir(path: str) -> None:
+    if path not in _CREATED_PATHS:
+        os.makedirs(path, exist_ok=True)
+        _CREATED_PATHS.add(path)
+
+
 @dataclass(frozen=True)
 class Mem0Env:
     api_key: Optional[str]
@@ -19,6 +29,7 @@ class Mem0Env:
     embedding_dims: int
 
 
+@functools.lru_cache(maxsize=1)
 def _load_bailian_env() -> Mem0Env:
     api_key = os.getenv("JKMEM_BAILIAN_API_KEY") or os.getenv("DASHSCOPE_API_KEY")
     base_url = os.getenv(
@@ -39,6 +50,7 @@ def _load_bailian_env() -> Mem0Env:
     )
 
 
+@functools.lru_cache(maxsize=1)
 def _build_vector_config() -> VectorStoreConfig:
     provider = os.getenv("JKMEM_VECTOR_PROVIDER", "qdrant")
     collection = os.getenv("JKMEM_VECTOR_COLLECTION", "jkmem_memories")
@@ -93,7 +105,7 @@ def _build_vector_config() -> VectorStoreConfig:
 
     if provider == "chroma":
         path = os.getenv("JKMEM_CHROMA_PATH", "data/vector/chroma")
-        os.makedirs(path, exist_ok=True)
+        _ensure_dir(path)
         return VectorStoreConfig(provider=provider, config={"path": path, "collection_name": collection})
 
     if provider == "qdrant":
@@ -124,13 +136,14 @@ def _build_vector_config() -> VectorStoreConfig:
                 config["api_key"] = api_key
             return VectorStoreConfig(provider=provider, config=config)
 
-        os.makedirs(path, exist_ok=True)
+        _ensure_dir(path)
         config["path"] = path
         return VectorStoreConfig(provider=provider, config=config)
 
     raise RuntimeError(f"Unsupported vector provider: {provider}")
 
 
+@functools.lru_cache(maxsize=1)
 def _build_graph_config(env: Mem0Env) -> GraphStoreConfig:
     provider = os.getenv("JKMEM_GRAPH_PROVIDER", "kuzu")
     enabled = os.getenv("JKMEM_GRAPH_ENABLED", "1") == "1"
@@ -140,7 +153,7 @@ def _build_graph_config(env: Mem0Env) -> GraphStoreConfig:
 
     if provider == "kuzu":
         db_path = os.getenv("JKMEM_GRAPH_PATH", "data/graph/kuzu.db")
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        _ensure_dir(os.path.dirname(db_path))
         return GraphStoreConfig(provider=provider, config={"db": db_path})
 
     if provider == "neo4j":
@@ -182,10 +195,11 @@ def _build_graph_config(env: Mem0Env) -> GraphStoreConfig:
     raise RuntimeError(f"Unsupported graph provider: {provider}")
 
 
+@functools.lru_cache(maxsize=1)
 def build_mem0_config() -> MemoryConfig:
     env = _load_bailian_env()
     history_path = os.getenv("JKMEM_MEM0_HISTORY_DB", "data/mem0/history.db")
-    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    _ensure_dir(os.path.dirname(history_path))
 
     llm = LlmConfig(
         provider="openai",
@@ -218,3 +232,9 @@ def build_mem0_config() -> MemoryConfig:
         history_db_path=history_path,
         version="v1.1",
     )
+
+
+def reload_mem0_config() -> None:
+    # Settings are read once per process; call this after changing env vars.
+    for cached in (_load_bailian_env, _build_vector_config, _build_graph_config, build_mem0_config):
+        cached.cache_clear()
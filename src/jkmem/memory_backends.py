@@ -1,17 +1,90 @@
+import functools
 import hashlib
 import json
+import logging
 import os
+import queue
 import sqlite3
 import threading
-from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 from jkmem.cache import LruCache, MultiLevelCache, SqliteCache
 from jkmem.mem0_config import build_mem0_config
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    from blake3 import blake3 as _key_hasher
+except ImportError:  # pragma: no cover - optional speedup
+    try:
+        from xxhash import xxh3_128 as _key_hasher
+    except ImportError:  # pragma: no cover - optional speedup
+        _key_hasher = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def _metadata_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+# Both encoders hand non-JSON values to the same default and coerce
+# non-str keys, so stored metadata does not depend on orjson being present.
+_ORJSON_METADATA_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None
+    else 0
+)
+
+
+def _dumps_metadata(metadata: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(metadata, default=_metadata_default, option=_ORJSON_METADATA_OPTIONS).decode("utf-8")
+    return json.dumps(metadata, default=_metadata_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def _loads_metadata(raw: str) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+MemoryItem = Tuple[List[Dict[str, str]], Optional[Dict[str, Any]]]
+
 
 class InMemoryBackend:
     def __init__(self) -> None:
+        # Entries are stored column-wise and identified by their position:
+        # _entries holds the result dicts, _memory_lower the lowercased text,
+        # _by_user each user's positions in insertion order, _trigrams the
+        # positions whose text contains each three-character window and
+        # _by_field the positions holding each hashable (key, value) pair.
         self._entries: List[Dict[str, str]] = []
+        self._memory_lower: List[str] = []
+        self._by_user: Dict[Any, List[int]] = defaultdict(list)
+        self._trigrams: Dict[str, Set[int]] = defaultdict(set)
+        self._by_field: Dict[Tuple[str, Any], Set[int]] = defaultdict(set)
 
     def add(
         self,
@@ -27,7 +100,22 @@ class InMemoryBackend:
                     entry: Dict[str, Any] = {"user_id": user_id, "memory": content}
                     if metadata:
                         entry.update(metadata)
+                    idx = len(self._entries)
+                    lowered = content.lower()
                     self._entries.append(entry)
+                    self._memory_lower.append(lowered)
+                    owner = entry.get("user_id")
+                    if _hashable(owner):
+                        self._by_user[owner].append(idx)
+                    for start in range(len(lowered) - 2):
+                        self._trigrams[lowered[start:start + 3]].add(idx)
+                    for key, value in entry.items():
+                        if key != "memory" and value is not None and _hashable(value):
+                            self._by_field[(key, value)].add(idx)
+
+    def add_many(self, items: List[MemoryItem], user_id: str = "default", **kwargs: Any) -> None:
+        for messages, metadata in items:
+            self.add(messages, user_id=user_id, metadata=metadata, **kwargs)
 
     def search(
         self,
@@ -43,17 +131,37 @@ class InMemoryBackend:
         
         query_lower = query.lower()
         matches = []
-        user_entries = [e for e in self._entries if e.get("user_id") == user_id]
+        matched_ids = set()
+        user_ids = self._by_user.get(user_id, [])
         
         # 1. Search content
-        for entry in user_entries:
+        candidates = user_ids
+        if len(query_lower) >= 3:
+            # Only entries containing every trigram of the query can contain it.
+            postings = sorted(
+                (self._trigrams.get(query_lower[start:start + 3], set()) for start in range(len(query_lower) - 2)),
+                key=len,
+            )
+            common = postings[0].intersection(*postings[1:])
+            # Walk whichever side is smaller; user_ids is already in order.
+            if len(common) < len(user_ids):
+                candidates = sorted(idx for idx in common if self._entries[idx].get("user_id") == user_id)
+            else:
+                candidates = [idx for idx in user_ids if idx in common]
+        allowed = self._filter_postings(filters)
+        if allowed is not None:
+            candidates = [idx for idx in candidates if idx in allowed]
+            filters = None
+        for idx in candidates:
+            entry = self._entries[idx]
             if filters:
                 if any(entry.get(key) != value for key, value in filters.items()):
                     continue
             
             # Substring match
-            if query_lower in entry["memory"].lower():
+            if query_lower in self._memory_lower[idx]:
                 matches.append(entry)
+                matched_ids.add(idx)
         
         # 2. Fallback / Fill up with recent if we have space (Simulation of Context)
         # In a real vector DB, we'd always get results.
@@ -61,27 +169,79 @@ class InMemoryBackend:
         if len(matches) < limit:
              # Get recent entries that aren't already matched
              # Reverse to get most recent
-             for entry in reversed(user_entries):
-                if entry not in matches:
-                    matches.append(entry)
+             for idx in reversed(user_ids):
+                if idx not in matched_ids:
+                    matches.append(self._entries[idx])
                     if len(matches) >= limit:
                         break
         
         return {"results": matches[:limit]}
 
+    def _filter_postings(self, filters: Optional[Dict[str, Any]]) -> Optional[Set[int]]:
+        # Positions satisfying every filter, or None when a filter value is
+        # None or unhashable and entries have to be checked one by one.
+        if not filters:
+            return None
+        postings = []
+        for key, value in filters.items():
+            if value is None or not _hashable(value):
+                return None
+            postings.append(self._by_field.get((key, value), set()))
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
 
 class SqliteBackend:
-    def __init__(self, path: Optional[str] = None) -> None:
+    def __init__(self, path: Optional[str] = None, read_pool_size: int = 8) -> None:
         self._path = path or _resolve_sqlite_path()
         os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        # SQLite serialises writers, so all writes share one connection; under
+        # WAL readers never block on it and each borrow a pooled connection.
         self._lock = threading.Lock()
+        self._writer = self._connect()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=max(1, read_pool_size))
         self._init_db()
 
     def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self._path)
+        # Autocommit mode: write transactions are opened explicitly in _write.
+        conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-20000")
+        return conn
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front, so a batch never has
+        # to upgrade from a read transaction halfway through.
+        with self._lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._writer
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+            self._writer.execute("COMMIT")
 
     def _init_db(self) -> None:
-        with self._connect() as conn:
+        with self._write() as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS memory_entries (
@@ -89,32 +249,103 @@ class SqliteBackend:
                     user_id TEXT NOT NULL,
                     memory TEXT NOT NULL,
                     metadata TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    memory_lower TEXT
                 )
                 """
             )
+            self._migrate_memory_lower(conn)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_user ON memory_entries(user_id)")
+        with self._lock:
+            self._fts = self._init_fts(self._writer)
+
+    def _migrate_memory_lower(self, conn: sqlite3.Connection) -> None:
+        # SQLite's lower() only folds ASCII, so the column is filled from Python.
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(memory_entries)")}
+        if "memory_lower" not in columns:
+            conn.execute("ALTER TABLE memory_entries ADD COLUMN memory_lower TEXT")
+        rows = conn.execute("SELECT id, memory FROM memory_entries WHERE memory_lower IS NULL").fetchall()
+        if rows:
+            conn.executemany(
+                "UPDATE memory_entries SET memory_lower = ? WHERE id = ?",
+                [(memory.lower(), row_id) for row_id, memory in rows],
+            )
+
+    def _init_fts(self, conn: sqlite3.Connection) -> bool:
+        # A trigram index answers substring queries of three or more characters
+        # without scanning every row; builds without FTS5 keep the plain scan.
+        # It indexes memory_lower case-sensitively, because SQLite's own case
+        # folding disagrees with str.lower() for characters such as "İ".
+        existing = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'memory_fts'"
+        ).fetchone()
+        if existing and "memory_lower" not in existing[0]:
+            conn.executescript(
+                """
+                DROP TRIGGER IF EXISTS memory_entries_ai;
+                DROP TRIGGER IF EXISTS memory_entries_ad;
+                DROP TRIGGER IF EXISTS memory_entries_au;
+                DROP TABLE memory_fts;
+                """
+            )
+            existing = None
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5("
+                "memory_lower, content='memory_entries', content_rowid='id', "
+                "tokenize='trigram case_sensitive 1')"
+            )
+        except sqlite3.OperationalError:
+            return False
+        conn.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS memory_entries_ai AFTER INSERT ON memory_entries BEGIN
+                INSERT INTO memory_fts(rowid, memory_lower) VALUES (new.id, new.memory_lower);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memory_entries_ad AFTER DELETE ON memory_entries BEGIN
+                INSERT INTO memory_fts(memory_fts, rowid, memory_lower) VALUES ('delete', old.id, old.memory_lower);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memory_entries_au AFTER UPDATE ON memory_entries BEGIN
+                INSERT INTO memory_fts(memory_fts, rowid, memory_lower) VALUES ('delete', old.id, old.memory_lower);
+                INSERT INTO memory_fts(rowid, memory_lower) VALUES (new.id, new.memory_lower);
+            END;
+            """
+        )
+        if not existing:
+            conn.execute("INSERT INTO memory_fts(memory_fts) VALUES ('rebuild')")
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._writer.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
 
     def add(
         self,
         messages: List[Dict[str, str]],
         user_id: str = "default",
         metadata: Optional[Dict[str, Any]] = None,
-        **_: Any,
+        **kwargs: Any,
     ) -> None:
+        self.add_many([(messages, metadata)], user_id=user_id, **kwargs)
+
+    def add_many(self, items: List[MemoryItem], user_id: str = "default", **_: Any) -> None:
         entries = []
-        for msg in messages:
-            if msg.get("role") == "assistant":
-                content = msg.get("content", "")
-                if content:
-                    entries.append((user_id, content, json.dumps(metadata or {})))
+        for messages, metadata in items:
+            encoded_metadata = _dumps_metadata(metadata or {})
+            for msg in messages:
+                if msg.get("role") == "assistant":
+                    content = msg.get("content", "")
+                    if content:
+                        entries.append((user_id, content, content.lower(), encoded_metadata))
         if not entries:
             return
-        with self._lock:
-            with self._connect() as conn:
-                conn.executemany(
-                    "INSERT INTO memory_entries (user_id, memory, metadata) VALUES (?, ?, ?)",
-                    entries,
-                )
+        with self._write() as conn:
+            conn.executemany(_INSERT_SQL, entries)
 
     def search(
         self,
@@ -125,42 +356,145 @@ class SqliteBackend:
         **_: Any,
     ) -> Dict[str, Any]:
         query_lower = query.lower()
-        with self._lock:
-            with self._connect() as conn:
-                rows = conn.execute(
-                    "SELECT id, user_id, memory, metadata FROM memory_entries WHERE user_id = ? ORDER BY id",
-                    (user_id,),
-                ).fetchall()
-
-        entries: List[Dict[str, Any]] = []
-        for _, row_user, memory, metadata_raw in rows:
-            metadata_obj: Dict[str, Any] = {}
-            if metadata_raw:
-                try:
-                    metadata_obj = json.loads(metadata_raw)
-                except json.JSONDecodeError:
-                    metadata_obj = {}
-            entry: Dict[str, Any] = {"user_id": row_user, "memory": memory, "metadata": metadata_obj}
-            entry.update(metadata_obj)
-            entries.append(entry)
-
-        if filters:
-            entries = [
-                entry
-                for entry in entries
-                if all(entry.get(key) == value for key, value in filters.items())
-            ]
+        use_fts = self._fts and len(query_lower) >= 3
+        matches: List[Dict[str, Any]] = []
+        matched_ids = set()
+        with self._reader() as conn:
+            # Rows are streamed and only decoded once their text matches, and the
+            # scan stops as soon as limit matches are found.
+            if use_fts:
+                params: Tuple[Any, ...] = (user_id, _fts_phrase(query_lower))
+                sql = _FTS_SEARCH_SQL
+                if not filters:
+                    sql += " LIMIT ?"
+                    params += (limit,)
+            else:
+                sql, params = _SCAN_SQL, (user_id,)
+            with closing(conn.execute(sql, params)) as cursor:
+                for row in cursor:
+                    # Candidates from the index are re-checked too, so both
+                    # paths match exactly what str.lower() substring search does.
+                    if query_lower not in row[4]:
+                        continue
+                    metadata = _decode_metadata(row[3])
+                    if _row_matches_filters(row, metadata, filters):
+                        matches.append(_build_entry(row, metadata))
+                        matched_ids.add(row[0])
+                        if len(matches) >= limit:
+                            break
+
+            if len(matches) < limit:
+                with closing(conn.execute(_RECENT_SQL, (user_id,))) as cursor:
+                    for row in cursor:
+                        if row[0] in matched_ids:
+                            continue
+                        metadata = _decode_metadata(row[3])
+                        if _row_matches_filters(row, metadata, filters):
+                            matches.append(_build_entry(row, metadata))
+                            if len(matches) >= limit:
+                                break
 
-        matches = [entry for entry in entries if query_lower in entry["memory"].lower()]
+        return {"results": matches[:limit]}
 
-        if len(matches) < limit:
-            for entry in reversed(entries):
-                if entry not in matches:
-                    matches.append(entry)
-                    if len(matches) >= limit:
-                        break
 
-        return {"results": matches[:limit]}
+_INSERT_SQL = "INSERT INTO memory_entries (user_id, memory, memory_lower, metadata) VALUES (?, ?, ?, ?)"
+_SCAN_SQL = (
+    "SELECT id, user_id, memory, metadata, memory_lower FROM memory_entries "
+    "WHERE user_id = ? ORDER BY id"
+)
+_RECENT_SQL = "SELECT id, user_id, memory, metadata FROM memory_entries WHERE user_id = ? ORDER BY id DESC"
+_FTS_SEARCH_SQL = (
+    "SELECT e.id, e.user_id, e.memory, e.metadata, e.memory_lower FROM memory_fts f "
+    "JOIN memory_entries e ON e.id = f.rowid "
+    "WHERE e.user_id = ? AND memory_fts MATCH ? ORDER BY e.id"
+)
+
+
+def _fts_phrase(query: str) -> str:
+    # Quote the whole query as one FTS5 string so operators and punctuation in
+    # it are matched literally.
+    return '"' + query.replace('"', '""') + '"'
+
+
+def _decode_metadata(metadata_raw: Optional[str]) -> Dict[str, Any]:
+    if not metadata_raw:
+        return {}
+    try:
+        return _loads_metadata(metadata_raw)
+    except json.JSONDecodeError:
+        return {}
+
+
+def _build_entry(row: Tuple[Any, ...], metadata: Dict[str, Any]) -> Dict[str, Any]:
+    # Metadata keys take precedence over the row fields, as they always have.
+    return {"user_id": row[1], "memory": row[2], "metadata": metadata, **metadata}
+
+
+def _row_matches_filters(
+    row: Tuple[Any, ...], metadata: Dict[str, Any], filters: Optional[Dict[str, Any]]
+) -> bool:
+    # Filters are checked against what _build_entry would produce, without
+    # building the entry for rows that are then thrown away.
+    if not filters:
+        return True
+    for key, value in filters.items():
+        if key in metadata:
+            actual = metadata[key]
+        elif key == "user_id":
+            actual = row[1]
+        elif key == "memory":
+            actual = row[2]
+        elif key == "metadata":
+            actual = metadata
+        else:
+            actual = None
+        if actual != value:
+            return False
+    return True
+
+
+class _PrefetchingEmbedder:
+    # Wraps mem0's embedder so raw (infer=False) adds can use vectors fetched
+    # ahead of time in one batched embeddings request per chunk of texts.
+    def __init__(self, embedder: Any, batch_size: int) -> None:
+        self._embedder = embedder
+        self._batch_size = max(1, batch_size)
+        self._prefetched: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._embedder, name)
+
+    def embed(self, text: str, memory_action: Optional[str] = None) -> Any:
+        if memory_action == "add":
+            with self._lock:
+                vector = self._prefetched.get(text)
+            if vector is not None:
+                return vector
+        return self._embedder.embed(text, memory_action)
+
+    def prefetch(self, texts: List[str]) -> None:
+        # Only the OpenAI-compatible embedder exposes a client that takes a list.
+        client = getattr(self._embedder, "client", None)
+        config = getattr(self._embedder, "config", None)
+        if client is None or config is None or not hasattr(client, "embeddings"):
+            return
+        pending = list(dict.fromkeys(texts))
+        for start in range(0, len(pending), self._batch_size):
+            chunk = pending[start:start + self._batch_size]
+            response = client.embeddings.create(
+                input=[text.replace("\n", " ") for text in chunk],
+                model=config.model,
+                dimensions=config.embedding_dims,
+            )
+            vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            with self._lock:
+                self._prefetched.update(zip(chunk, vectors))
+
+    def discard(self, texts: List[str]) -> None:
+        with self._lock:
+            for text in texts:
+                self._prefetched.pop(text, None)
 
 
 class Mem0Backend:
@@ -168,7 +502,19 @@ class Mem0Backend:
         from mem0 import Memory
 
         self._memory = Memory(config=build_mem0_config())
+        self._embedder = _PrefetchingEmbedder(
+            self._memory.embedding_model,
+            batch_size=int(os.getenv("JKMEM_EMBED_BATCH_SIZE", "10")),
+        )
+        self._memory.embedding_model = self._embedder
         self._cache = _build_cache()
+        # mem0 only locks its history DB, and the vector and graph stores are
+        # not known to be safe under concurrent writes, so adds run one at a
+        # time unless concurrency is asked for.
+        self._add_workers = max(1, int(os.getenv("JKMEM_MEM0_ADD_WORKERS", "1")))
+        self._build_key = _make_cache_key_builder()
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
 
     def add(
         self,
@@ -182,6 +528,47 @@ class Mem0Backend:
             self._cache.clear()
         return result
 
+    def add_many(self, items: List[MemoryItem], user_id: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        # mem0 has no bulk add; run the per-item adds and drop the search cache
+        # once for the whole batch.
+        def add_one(item: MemoryItem) -> Dict[str, Any]:
+            messages, metadata = item
+            return self._memory.add(messages, user_id=user_id, metadata=metadata, **kwargs)
+
+        texts: List[str] = []
+        if kwargs.get("infer") is False:
+            # Raw adds embed each non-system message as-is, so those texts can be
+            # embedded up front in batches instead of one request per message.
+            texts = [
+                msg["content"]
+                for messages, _ in items
+                for msg in messages
+                if msg.get("role") not in (None, "system") and isinstance(msg.get("content"), str)
+            ]
+        try:
+            if texts:
+                try:
+                    self._embedder.prefetch(texts)
+                except Exception as exc:
+                    # Batching is only an optimisation: anything not prefetched
+                    # is embedded by its own add below.
+                    logger.warning("Batched embedding prefetch failed, embedding per item: %s", exc)
+            workers = min(self._add_workers, len(items))
+            if workers <= 1:
+                return [add_one(item) for item in items]
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(add_one, items))
+        finally:
+            self._embedder.discard(texts)
+            if self._cache:
+                self._cache.clear()
+
+    def close(self) -> None:
+        # Searches after close() simply bypass the cache.
+        cache, self._cache = self._cache, None
+        if cache:
+            cache.close()
+
     def search(
         self,
         query: str,
@@ -191,45 +578,117 @@ class Mem0Backend:
         threshold: Optional[float] = None,
         **kwargs: Any,
     ) -> Dict[str, Any]:
-        cache_key = None
+        cache_key = self._build_key(query, user_id, limit, filters, threshold, kwargs)
         if self._cache:
-            cache_key = _build_cache_key(
-                query=query,
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        # Concurrent identical searches share a single mem0 round trip.
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[cache_key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._memory.search(
+                query,
                 user_id=user_id,
                 limit=limit,
                 filters=filters,
                 threshold=threshold,
-                extra=kwargs,
+                **kwargs,
             )
-            cached = self._cache.get(cache_key)
-            if cached is not None:
-                return cached
-        result = self._memory.search(
-            query,
-            user_id=user_id,
-            limit=limit,
-            filters=filters,
-            threshold=threshold,
-            **kwargs,
-        )
-        if self._cache and cache_key:
-            self._cache.set(cache_key, result)
+            if self._cache:
+                self._cache.set(cache_key, result)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
         return result
 
 
-def _build_cache_key(
-    *, query: str, user_id: str, limit: int, filters: Optional[Dict[str, Any]], threshold: Optional[float], extra: Dict[str, Any]
-) -> str:
-    payload = {
-        "query": query,
-        "user_id": user_id,
-        "limit": limit,
-        "filters": filters or {},
-        "threshold": threshold,
-        "extra": extra,
-    }
-    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
-    return hashlib.sha256(encoded).hexdigest()
+def _freeze(mapping: Optional[Dict[str, Any]]) -> Tuple[Tuple[Any, type, Any], ...]:
+    # Value types are part of the key so that e.g. 1 and True, which hash
+    # equal, do not share an encoded suffix.
+    if not mapping:
+        return ()
+    return tuple(sorted((key, type(value), value) for key, value in mapping.items()))
+
+
+@functools.lru_cache(maxsize=1024, typed=True)
+def _cache_key_suffix(
+    user_id: str,
+    limit: int,
+    threshold: Optional[float],
+    filters: Tuple[Tuple[Any, type, Any], ...],
+    extra: Tuple[Tuple[Any, type, Any], ...],
+) -> bytes:
+    return _encode_key_part(
+        {
+            "user_id": user_id,
+            "limit": limit,
+            "filters": {key: value for key, _, value in filters},
+            "threshold": threshold,
+            "extra": {key: value for key, _, value in extra},
+        }
+    )
+
+
+def _encode_key_part(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+
+
+CacheKeyBuilder = Callable[[str, str, int, Optional[Dict[str, Any]], Optional[float], Dict[str, Any]], str]
+
+
+def _make_cache_key_builder() -> CacheKeyBuilder:
+    # The encoder and hasher are picked once here so a search only pays for
+    # positional arguments and local lookups. Cache keys only need to be well
+    # distributed, not collision resistant against an attacker.
+    if orjson is not None:
+        encode_query = orjson.dumps
+    else:
+        def encode_query(query: str) -> bytes:
+            return json.dumps(query).encode("utf-8")
+    if _key_hasher is not None:
+        hasher = _key_hasher
+    else:
+        hasher = functools.partial(hashlib.blake2b, digest_size=16)
+
+    def build(
+        query: str,
+        user_id: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        threshold: Optional[float],
+        extra: Dict[str, Any],
+        _suffix: Callable[..., bytes] = _cache_key_suffix,
+        _freeze: Callable[[Optional[Dict[str, Any]]], Tuple[Any, ...]] = _freeze,
+    ) -> str:
+        # Everything but the query tends to repeat across a session, so that
+        # part is encoded once per shape and the query, as a JSON string, is
+        # prepended.
+        try:
+            suffix = _suffix(user_id, limit, threshold, _freeze(filters), _freeze(extra))
+        except TypeError:
+            # Unhashable or unsortable filter/option values: encode this shape uncached.
+            suffix = _encode_key_part(
+                {"user_id": user_id, "limit": limit, "filters": filters or {}, "threshold": threshold, "extra": extra}
+            )
+        return hasher(encode_query(query) + suffix).hexdigest()
+
+    return build
 
 
 def _build_cache() -> Optional[MultiLevelCache]:
@@ -243,7 +702,11 @@ def _build_cache() -> Optional[MultiLevelCache]:
     l2_ttl = int(os.getenv("JKMEM_CACHE_L2_TTL", "900"))
     l2 = None
     if os.getenv("JKMEM_CACHE_L2_ENABLED", "1") == "1":
-        l2 = SqliteCache(l2_path, ttl_seconds=l2_ttl)
+        l2 = SqliteCache(
+            l2_path,
+            ttl_seconds=l2_ttl,
+            compress=os.getenv("JKMEM_CACHE_L2_COMPRESS", "0") == "1",
+        )
     return MultiLevelCache(l1, l2)
 
 
@@ -260,10 +723,25 @@ def _resolve_sqlite_path() -> str:
 
 
 def get_memory_backend() -> Any:
-    if os.getenv("JKMEM_USE_SQLITE") == "1":
+    # Repeat calls with the same settings share one backend instance; call
+    # reset_memory_backend() to build a fresh one.
+    return _memory_backend(
+        os.getenv("JKMEM_USE_SQLITE"),
+        os.getenv("JKMEM_USE_MEM0", "1"),
+        os.getenv("JKMEM_SQLITE_PATH"),
+    )
+
+
+def reset_memory_backend() -> None:
+    _memory_backend.cache_clear()
+
+
+@functools.lru_cache(maxsize=4)
+def _memory_backend(use_sqlite: Optional[str], use_mem0: str, sqlite_path: Optional[str]) -> Any:
+    if use_sqlite == "1":
         return SqliteBackend()
 
-    if os.getenv("JKMEM_USE_MEM0", "1") == "1":
+    if use_mem0 == "1":
         try:
             return Mem0Backend()
         except Exception as exc:
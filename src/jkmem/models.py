@@ -58,7 +58,9 @@ class DocumentType(str, Enum):
 
 
 class ORMBaseModel(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
+    # Records are built once and never mutated; freezing them makes that a
+    # guarantee and keeps validate_assignment hooks off the attribute path.
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
 
 
 class SourceRef(ORMBaseModel):
@@ -83,10 +85,9 @@ class MemoryMetadata(ORMBaseModel):
     extra: Dict[str, Any] = Field(default_factory=dict)
 
     def to_metadata(self) -> Dict[str, Any]:
-        data = self.model_dump(exclude_none=True)
-        extra = data.pop("extra", {})
-        if extra:
-            data.update(extra)
+        data = self.model_dump(exclude={"extra"}, exclude_none=True)
+        if self.extra:
+            data.update(self.extra)
         return data
 
 
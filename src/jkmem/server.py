@@ -1,17 +1,22 @@
+import logging
+import logging.handlers
 import os
+import queue
 from typing import Dict, Any, Optional
 from fastapi import FastAPI, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from jkmem.agent import MemoryAgent
-from jkmem.llm import call_llm
-from jkmem.memory_backends import get_memory_backend
+from jkmem.llm import call_llm, close_response_cache
+from jkmem.memory_backends import get_memory_backend, reset_memory_backend
 from jkmem.medical.report_parser import ReportService
 from jkmem.graph_store import get_graph_store
 
 app = FastAPI(title="AskBob Medical Agent", version="1.0.0")
 
+logger = logging.getLogger("jkmem.server")
+
 # Enable CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -21,10 +26,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global State
-agent: Optional[MemoryAgent] = None
-report_service: Optional[ReportService] = None
-graph_store: Optional[Any] = None
+# Shared services live on app.state; they are filled in by startup_event.
+app.state.agent = None
+app.state.memory = None
+app.state.report_service = None
+app.state.graph_store = None
+app.state.log_listener = None
 
 class ChatRequest(BaseModel):
     message: str
@@ -37,38 +44,64 @@ class ReportRequest(BaseModel):
     patient_id: str
     title: Optional[str] = None
 
+def _start_log_listener() -> None:
+    # Records are written by the listener's thread, so logging from a
+    # handler never blocks the event loop on a slow stream.
+    if app.state.log_listener is not None:
+        return
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    app.state.log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    app.state.log_listener.start()
+
+
 @app.on_event("startup")
 async def startup_event():
-    global agent, report_service, graph_store
+    _start_log_listener()
     try:
         memory = get_memory_backend()
+        app.state.memory = memory
         # Initialize Agent
-        agent = MemoryAgent(memory=memory, llm_fn=call_llm)
+        app.state.agent = MemoryAgent(memory=memory, llm_fn=call_llm)
         
         try:
-            graph_store = get_graph_store()
+            app.state.graph_store = get_graph_store()
         except Exception as exc:
-            graph_store = None
-            print(f"Graph store initialization skipped: {exc}")
+            app.state.graph_store = None
+            logger.warning("Graph store initialization skipped: %s", exc)
 
-        report_service = ReportService(memory_backend=memory, graph_store=graph_store)
+        app.state.report_service = ReportService(memory_backend=memory, graph_store=app.state.graph_store)
         
-        print("Backend initialized successfully.")
+        logger.info("Backend initialized successfully.")
     except Exception as e:
-        print(f"Error initializing backend: {e}")
+        logger.error("Error initializing backend: %s", e)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    if graph_store:
-        graph_store.close()
+    if app.state.graph_store:
+        app.state.graph_store.close()
+    close_memory = getattr(app.state.memory, "close", None)
+    if close_memory is not None:
+        close_memory()
+    reset_memory_backend()
+    close_response_cache()
+    if app.state.log_listener is not None:
+        app.state.log_listener.stop()
+        app.state.log_listener = None
+        for handler in list(logger.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler):
+                logger.removeHandler(handler)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "agent_initialized": agent is not None}
+    return {"status": "ok", "agent_initialized": app.state.agent is not None}
 
 @app.post("/api/chat")
 async def chat_endpoint(request: ChatRequest):
+    agent = app.state.agent
     if not agent:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
@@ -87,11 +120,12 @@ async def chat_endpoint(request: ChatRequest):
 
 @app.post("/api/upload_report")
 async def upload_report(request: ReportRequest):
+    report_service = app.state.report_service
     if not report_service:
         raise HTTPException(status_code=503, detail="Report service not initialized")
     
     try:
-        result = report_service.parse_and_store(
+        result = await report_service.aparse_and_store(
             user_id=request.user_id,
             report_text=request.report_text,
             patient_id=request.patient_id,
@@ -23,6 +23,15 @@ class TestAgentE2E(unittest.TestCase):
         results = backend.search("ok", user_id="user_1")
         self.assertGreaterEqual(len(results.get("results", [])), 1)
 
+    def test_agent_stream_stores_full_reply(self) -> None:
+        backend = InMemoryBackend()
+        agent = MemoryAgent(backend, _stub_llm, llm_stream_fn=lambda system_prompt, user_message: iter(["o", "k"]))
+
+        self.assertEqual(list(agent.respond_stream("Hello", user_id="user_1")), ["o", "k"])
+
+        results = backend.search("ok", user_id="user_1")
+        self.assertIn("ok", [entry["memory"] for entry in results.get("results", [])])
+
 
 if __name__ == "__main__":
     unittest.main()
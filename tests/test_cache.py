@@ -1,13 +1,21 @@
+import gc
 import os
 import tempfile
 import time
 import unittest
+import weakref
 
 from bootstrap import add_src_path
 
 add_src_path()
 
-from jkmem.cache import LruCache, MultiLevelCache, SqliteCache
+from jkmem.cache import LruCache, MultiLevelCache, SqliteCache, _flush_open_sqlite_caches
+
+try:
+    import zstandard  # noqa: F401
+    ZSTD_AVAILABLE = True
+except Exception:
+    ZSTD_AVAILABLE = False
 
 
 class TestLruCache(unittest.TestCase):
@@ -35,6 +43,67 @@ class TestSqliteCache(unittest.TestCase):
             cache.set("k", {"v": 1})
             self.assertEqual(cache.get("k"), {"v": 1})
 
+    def test_flush_persists_pending_writes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cache.db")
+            cache = SqliteCache(path, ttl_seconds=60, flush_interval=60)
+            cache.set("k", {"v": 1})
+            cache.flush()
+            reopened = SqliteCache(path, ttl_seconds=60)
+            self.assertEqual(reopened.get("k"), {"v": 1})
+            reopened.close()
+            cache.close()
+
+    def test_pending_writes_flush_after_interval(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cache.db")
+            cache = SqliteCache(path, ttl_seconds=60, flush_interval=0.05)
+            cache.set("k", {"v": 1})
+            time.sleep(0.3)
+            reopened = SqliteCache(path, ttl_seconds=60)
+            self.assertEqual(reopened.get("k"), {"v": 1})
+            reopened.close()
+            cache.close()
+
+    def test_unclosed_cache_is_released_after_flush(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cache.db")
+            cache = SqliteCache(path, ttl_seconds=60, flush_interval=0.05)
+            cache.set("k", {"v": 1})
+            cache_ref = weakref.ref(cache)
+            del cache
+            time.sleep(0.3)
+            gc.collect()
+            self.assertIsNone(cache_ref())
+            reopened = SqliteCache(path, ttl_seconds=60)
+            self.assertEqual(reopened.get("k"), {"v": 1})
+            reopened.close()
+
+    def test_exit_hook_flushes_pending_writes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cache.db")
+            cache = SqliteCache(path, ttl_seconds=60, flush_interval=60)
+            cache.set("k", {"v": 1})
+            _flush_open_sqlite_caches()
+            reopened = SqliteCache(path, ttl_seconds=60)
+            self.assertEqual(reopened.get("k"), {"v": 1})
+            reopened.close()
+            cache.close()
+
+    @unittest.skipUnless(ZSTD_AVAILABLE, "zstandard not installed")
+    def test_compressed_values_round_trip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cache.db")
+            value = {"results": [{"memory": "x" * 64, "id": i} for i in range(200)]}
+            cache = SqliteCache(path, ttl_seconds=60, compress=True)
+            cache.set("big", value)
+            cache.set("small", {"v": 1})
+            cache.close()
+            reopened = SqliteCache(path, ttl_seconds=60)
+            self.assertEqual(reopened.get("big"), value)
+            self.assertEqual(reopened.get("small"), {"v": 1})
+            reopened.close()
+
     def test_expiry(self) -> None:
         with tempfile.TemporaryDirectory() as tmpdir:
             path = os.path.join(tmpdir, "cache.db")
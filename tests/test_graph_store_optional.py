@@ -1,12 +1,22 @@
 import os
 import tempfile
 import unittest
+from datetime import datetime
 
 from bootstrap import add_src_path
 
 add_src_path()
 
 from jkmem.graph_store import KuzuGraphStore
+from jkmem.models import (
+    Document,
+    Encounter,
+    Medication,
+    MedicationStatus,
+    Observation,
+    ObservationCategory,
+    PatientProfile,
+)
 
 
 try:
@@ -15,6 +25,12 @@ try:
 except Exception:
     KUZU_AVAILABLE = False
 
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
 
 @unittest.skipUnless(KUZU_AVAILABLE, "kuzu not installed")
 class TestKuzuGraphStore(unittest.TestCase):
@@ -24,6 +40,112 @@ class TestKuzuGraphStore(unittest.TestCase):
             store = KuzuGraphStore(path)
             store.close()
 
+    def test_batch_ingest(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "graph.kuzu")
+            store = KuzuGraphStore(path)
+            store.add_patients_batch([PatientProfile(patient_id="patient_1")])
+            store.add_encounters_batch(
+                [Encounter(encounter_id="enc_1", patient_id="patient_1", encounter_type="visit")]
+            )
+            store.add_medications_batch(
+                [
+                    Medication(
+                        medication_id="med_1",
+                        patient_id="patient_1",
+                        encounter_id="enc_1",
+                        name="Aspirin",
+                        status=MedicationStatus.ACTIVE,
+                    ),
+                    Medication(medication_id="med_2", patient_id="patient_1", name="Metformin"),
+                ]
+            )
+            store.add_documents_batch(
+                [
+                    Document(document_id="doc_1", patient_id="patient_1", encounter_id="enc_1"),
+                    Document(document_id="doc_2", patient_id="patient_1"),
+                ]
+            )
+
+            active = store.get_active_medications("patient_1")
+            self.assertEqual([row["medication_id"] for row in active], ["med_1"])
+            record = store.get_encounter_record("enc_1")
+            self.assertEqual(len(record["medications"]), 1)
+            self.assertEqual(len(record["documents"]), 1)
+            self.assertEqual(len(store.get_medication_pairs("patient_1")), 1)
+            store.close()
+
+    def test_patient_timeline_limit(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "graph.kuzu")
+            store = KuzuGraphStore(path)
+            store.add_patient(PatientProfile(patient_id="patient_1"))
+            for day in range(1, 4):
+                store.add_medication(
+                    Medication(
+                        medication_id=f"med_{day}",
+                        patient_id="patient_1",
+                        name="Aspirin",
+                        start_date=datetime(2024, 1, day),
+                    )
+                )
+            store.add_document(
+                Document(document_id="doc_1", patient_id="patient_1", extracted_at=datetime(2024, 1, 5))
+            )
+
+            timeline = store.get_patient_timeline("patient_1", limit=2)
+            self.assertEqual([row["ref_id"] for row in timeline], ["doc_1", "med_3"])
+            store.close()
+
+    def test_repeat_write_waits_for_parent(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "graph.kuzu")
+            store = KuzuGraphStore(path)
+            observation = Observation(
+                observation_id="obs_1",
+                patient_id="patient_1",
+                encounter_id="enc_1",
+                category=ObservationCategory.LAB,
+                name="Hb",
+            )
+            store.add_observation(observation)
+            store.add_patient(PatientProfile(patient_id="patient_1"))
+            store.add_encounter(Encounter(encounter_id="enc_1", patient_id="patient_1", encounter_type="visit"))
+            store.add_observation(observation)
+            self.assertEqual(len(store.get_encounter_record("enc_1")["observations"]), 1)
+
+            calls = []
+            store._exec = lambda query, params=None: calls.append(query)
+            store.add_observation(observation)
+            store.add_patients_batch([PatientProfile(patient_id="patient_1")])
+            self.assertEqual(calls, [])
+            store.close()
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow not installed")
+    def test_bulk_load_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "graph.kuzu")
+            store = KuzuGraphStore(path)
+            store.bulk_load_rows("Patient", [{"patient_id": "patient_1"}])
+            store.bulk_load_rows(
+                "Medication",
+                [
+                    {"medication_id": "med_1", "name": "Aspirin", "status": "active"},
+                    {"medication_id": "med_2", "name": "Metformin", "start_date": datetime(2024, 1, 2)},
+                ],
+            )
+            store.bulk_load_rows(
+                "TAKES_MEDICATION",
+                [{"from": "patient_1", "to": "med_1"}, {"from": "patient_1", "to": "med_2"}],
+            )
+
+            active = store.get_active_medications("patient_1")
+            self.assertEqual([row["medication_id"] for row in active], ["med_1"])
+            self.assertEqual(len(store.get_medication_pairs("patient_1")), 1)
+            with self.assertRaises(ValueError):
+                store.bulk_load("Unknown", os.path.join(tmpdir, "rows.parquet"))
+            store.close()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from bootstrap import add_src_path
+
+add_src_path()
+
+from jkmem import llm
+
+
+class TestStreamLlm(unittest.TestCase):
+    def setUp(self) -> None:
+        env = mock.patch.dict(os.environ, {"JKMEM_BAILIAN_API_KEY": "test-key", "JKMEM_LLM_MODE": ""})
+        env.start()
+        self.addCleanup(env.stop)
+        self.closed = False
+
+    def _fake_stream(self, lines):
+        def stream_lines(url, body, headers):
+            try:
+                yield from lines
+            finally:
+                self.closed = True
+
+        return mock.patch.object(llm, "_stream_lines", side_effect=stream_lines)
+
+    def test_yields_delta_content_until_done(self) -> None:
+        lines = [
+            b": keep-alive\n",
+            b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n',
+            b"\n",
+            b'data: {"choices": [{"delta": {"content": "Hel"}}]}\n',
+            b'data:{"choices": [{"delta": {"content": "lo"}}]}\n',
+            b'data: {"choices": [{"finish_reason": "stop"}]}\n',
+            b'data: {"choices": []}\n',
+            b"data: [DONE]\n",
+            b'data: {"choices": [{"delta": {"content": "ignored"}}]}\n',
+        ]
+        with self._fake_stream(lines):
+            self.assertEqual(list(llm.stream_llm("system", "hi")), ["Hel", "lo"])
+        self.assertTrue(self.closed)
+
+    def test_closing_early_closes_the_stream(self) -> None:
+        lines = [b'data: {"choices": [{"delta": {"content": "token"}}]}\n'] * 3
+        with self._fake_stream(lines):
+            chunks = llm.stream_llm("system", "hi")
+            self.assertEqual(next(chunks), "token")
+            chunks.close()
+        self.assertTrue(self.closed)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        env = mock.patch.dict(
+            os.environ,
+            {
+                "JKMEM_BAILIAN_API_KEY": "test-key",
+                "JKMEM_LLM_MODE": "",
+                "JKMEM_LLM_CACHE": "1",
+                "JKMEM_LLM_CACHE_PATH": os.path.join(tmpdir.name, "llm_cache.db"),
+                "JKMEM_BAILIAN_MODEL": "model-a",
+                "JKMEM_BAILIAN_TEMPERATURE": "0",
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        llm._response_cache.cache_clear()
+        self.addCleanup(llm.close_response_cache)
+        post = mock.patch.object(llm, "_post", side_effect=self._reply)
+        self.post = post.start()
+        self.addCleanup(post.stop)
+
+    @staticmethod
+    def _reply(url, body, headers):
+        request = json.loads(body)
+        content = f"{request['model']}:{request['messages'][1]['content']}"
+        return json.dumps({"choices": [{"message": {"content": content}}]}).encode("utf-8")
+
+    def test_deterministic_calls_are_served_from_cache(self) -> None:
+        self.assertEqual(llm.call_llm("system", "hi"), "model-a:hi")
+        self.assertEqual(llm.call_llm("system", "hi"), "model-a:hi")
+        self.assertEqual(self.post.call_count, 1)
+
+        self.assertEqual(llm.call_llm("system", "other"), "model-a:other")
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_sampled_calls_are_not_cached(self) -> None:
+        with mock.patch.dict(os.environ, {"JKMEM_BAILIAN_TEMPERATURE": "0.2"}):
+            llm.call_llm("system", "hi")
+            llm.call_llm("system", "hi")
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_cache_key_covers_model(self) -> None:
+        llm.call_llm("system", "hi")
+        with mock.patch.dict(os.environ, {"JKMEM_BAILIAN_MODEL": "model-b"}):
+            self.assertEqual(llm.call_llm("system", "hi"), "model-b:hi")
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_cached_replies_survive_closing_the_cache(self) -> None:
+        llm.call_llm("system", "hi")
+        llm.close_response_cache()
+        self.assertEqual(llm.call_llm("system", "hi"), "model-a:hi")
+        self.assertEqual(self.post.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,17 @@
+import os
+import sqlite3
+import tempfile
 import unittest
+from contextlib import closing
+from datetime import datetime
+from unittest import mock
 
 from bootstrap import add_src_path
 
 add_src_path()
 
-from jkmem.memory_backends import InMemoryBackend
+from jkmem import memory_backends
+from jkmem.memory_backends import InMemoryBackend, SqliteBackend
 
 
 class TestInMemoryBackend(unittest.TestCase):
@@ -26,5 +33,196 @@ class TestInMemoryBackend(unittest.TestCase):
         self.assertEqual(len(results_mismatch.get("results", [])), 0)
 
 
+    def _backend(self, *contents, user_id="user_1", **metadata):
+        backend = InMemoryBackend()
+        for content in contents:
+            backend.add([{"role": "assistant", "content": content}], user_id=user_id, metadata=metadata or None)
+        return backend
+
+    @staticmethod
+    def _memories(results):
+        return [entry["memory"] for entry in results["results"]]
+
+    def test_short_queries_scan_every_entry(self) -> None:
+        backend = self._backend("Hi there", "Which one", "Nothing")
+
+        self.assertEqual(self._memories(backend.search("hi", user_id="user_1", limit=2)), ["Hi there", "Which one"])
+        self.assertEqual(
+            self._memories(backend.search("", user_id="user_1", limit=5)),
+            ["Hi there", "Which one", "Nothing"],
+        )
+
+    def test_recent_fill_is_newest_first_after_matches(self) -> None:
+        backend = self._backend("first", "glucose 105", "third", "fourth")
+
+        results = backend.search("glucose", user_id="user_1", limit=3)
+
+        self.assertEqual(self._memories(results), ["glucose 105", "fourth", "third"])
+
+    def test_filters_use_field_postings(self) -> None:
+        backend = InMemoryBackend()
+        for content, patient_id in (("glucose high", "patient_1"), ("glucose low", "patient_2"), ("note", "patient_1")):
+            backend.add(
+                [{"role": "assistant", "content": content}],
+                user_id="user_1",
+                metadata={"patient_id": patient_id, "source_type": "report"},
+            )
+
+        results = backend.search(
+            "glucose", user_id="user_1", limit=1, filters={"patient_id": "patient_2", "source_type": "report"}
+        )
+        self.assertEqual(self._memories(results), ["glucose low"])
+
+        results = backend.search("glucose", user_id="user_1", limit=1, filters={"patient_id": "patient_1"})
+        self.assertEqual(self._memories(results), ["glucose high"])
+
+    def test_filters_with_none_or_unhashable_values(self) -> None:
+        backend = InMemoryBackend()
+        backend.add(
+            [{"role": "assistant", "content": "glucose high"}],
+            user_id="user_1",
+            metadata={"tags": ["lab"], "encounter_id": "enc_1"},
+        )
+        backend.add([{"role": "assistant", "content": "glucose low"}], user_id="user_1", metadata={"tags": ["vitals"]})
+
+        results = backend.search("glucose", user_id="user_1", limit=1, filters={"tags": ["lab"]})
+        self.assertEqual(self._memories(results), ["glucose high"])
+
+        results = backend.search("glucose", user_id="user_1", limit=1, filters={"encounter_id": None})
+        self.assertEqual(self._memories(results), ["glucose low"])
+
+    def test_metadata_user_id_overrides_owner(self) -> None:
+        backend = InMemoryBackend()
+        backend.add(
+            [{"role": "assistant", "content": "glucose 105"}],
+            user_id="user_1",
+            metadata={"user_id": "user_2"},
+        )
+
+        self.assertEqual(self._memories(backend.search("glucose", user_id="user_1")), [])
+        results = backend.search("glucose", user_id="user_2")
+        self.assertEqual(results["results"], [{"user_id": "user_2", "memory": "glucose 105"}])
+
+    def test_non_ascii_queries_are_case_insensitive(self) -> None:
+        backend = self._backend("İstanbul trip", "Ärztin visit", "note")
+
+        self.assertEqual(self._memories(backend.search("İSTANBUL", user_id="user_1", limit=1)), ["İstanbul trip"])
+        self.assertEqual(self._memories(backend.search("ÄRZTIN", user_id="user_1", limit=1)), ["Ärztin visit"])
+
+
+class TestSqliteBackend(unittest.TestCase):
+    def test_add_many_keeps_per_item_metadata(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = SqliteBackend(os.path.join(tmpdir, "memories.db"))
+            backend.add_many(
+                [
+                    ([{"role": "assistant", "content": "Document"}], {"source_id": "doc_1"}),
+                    ([{"role": "assistant", "content": "Observation"}], {"source_id": "obs_1"}),
+                ],
+                user_id="user_1",
+                infer=False,
+            )
+
+            results = backend.search("observation", user_id="user_1", filters={"source_id": "obs_1"})
+            self.assertEqual([entry["memory"] for entry in results["results"]], ["Observation"])
+
+    def _assistant(self, content):
+        return [{"role": "assistant", "content": content}]
+
+    def test_fts_search_matches_lowercased_substrings(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = SqliteBackend(os.path.join(tmpdir, "memories.db"))
+            if not backend._fts:
+                self.skipTest("SQLite build has no FTS5 trigram tokenizer")
+            backend.add_many(
+                [
+                    (self._assistant("İstanbul trip"), {}),
+                    (self._assistant("Blood GLUCOSE 105"), {}),
+                    (self._assistant("ᎠᎡᎢ clinic"), {}),
+                    (self._assistant("note"), {}),
+                ],
+                user_id="user_1",
+            )
+
+            def search(query):
+                return [entry["memory"] for entry in backend.search(query, user_id="user_1", limit=1)["results"]]
+
+            self.assertEqual(search("glucose"), ["Blood GLUCOSE 105"])
+            self.assertEqual(search("İSTANBUL"), ["İstanbul trip"])
+            self.assertEqual(search("ꭰꭱꭲ"), ["ᎠᎡᎢ clinic"])
+            # "istanbul" is not a substring of "i̇stanbul", so only the recent fill answers.
+            self.assertEqual(search("istanbul"), ["note"])
+
+    def test_fts_search_stops_at_limit_in_id_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = SqliteBackend(os.path.join(tmpdir, "memories.db"))
+            backend.add_many(
+                [
+                    (self._assistant(f"glucose {idx}"), {"patient_id": "patient_1" if idx >= 3 else "patient_2"})
+                    for idx in range(6)
+                ],
+                user_id="user_1",
+            )
+
+            results = backend.search("glucose", user_id="user_1", limit=2)
+            self.assertEqual([entry["memory"] for entry in results["results"]], ["glucose 0", "glucose 1"])
+
+            results = backend.search("glucose", user_id="user_1", limit=2, filters={"patient_id": "patient_1"})
+            self.assertEqual([entry["memory"] for entry in results["results"]], ["glucose 3", "glucose 4"])
+
+    def test_opens_database_created_without_memory_lower(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "memories.db")
+            with closing(sqlite3.connect(path)) as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE memory_entries (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id TEXT NOT NULL,
+                        memory TEXT NOT NULL,
+                        metadata TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
+                )
+                conn.executemany(
+                    "INSERT INTO memory_entries (user_id, memory, metadata) VALUES (?, ?, ?)",
+                    [("user_1", "Blood GLUCOSE 105", '{"source_id": "obs_1"}'), ("user_1", "Hemoglobin 12.3", "{}")],
+                )
+                conn.commit()
+
+            backend = SqliteBackend(path)
+            backend.add([{"role": "assistant", "content": "Glucose 98"}], user_id="user_1")
+
+            results = backend.search("glucose", user_id="user_1", limit=2)
+            self.assertEqual([entry["memory"] for entry in results["results"]], ["Blood GLUCOSE 105", "Glucose 98"])
+            self.assertEqual(results["results"][0]["source_id"], "obs_1")
+            backend.close()
+
+            with closing(sqlite3.connect(path)) as conn:
+                lowered = conn.execute("SELECT memory_lower FROM memory_entries ORDER BY id").fetchall()
+                self.assertEqual(lowered, [("blood glucose 105",), ("hemoglobin 12.3",), ("glucose 98",)])
+
+    def test_datetime_metadata_round_trips(self) -> None:
+        recorded_at = datetime(2024, 1, 1, 8, 30, 0)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = SqliteBackend(os.path.join(tmpdir, "memories.db"))
+            backend.add(
+                [{"role": "assistant", "content": "Glucose 105"}],
+                user_id="user_1",
+                metadata={"recorded_at": recorded_at, 7: "seven"},
+                infer=False,
+            )
+
+            results = backend.search("glucose", user_id="user_1")
+            entry = results["results"][0]
+            self.assertEqual(entry["metadata"], {"recorded_at": "2024-01-01T08:30:00", "7": "seven"})
+
+    def test_metadata_encoding_does_not_depend_on_orjson(self) -> None:
+        metadata = {"recorded_at": datetime(2024, 1, 1, 8, 30, 0), 7: "seven", "name": "血糖"}
+        encoded = memory_backends._dumps_metadata(metadata)
+        with mock.patch.object(memory_backends, "orjson", None):
+            self.assertEqual(memory_backends._dumps_metadata(metadata), encoded)
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from datetime import datetime
 
@@ -5,8 +6,17 @@ from bootstrap import add_src_path
 
 add_src_path()
 
-from jkmem.medical.report_parser import ReportParser
-from jkmem.models import DocumentType, ObservationCategory
+from jkmem.medical.report_parser import ReportParser, ReportService
+from jkmem.medical.utils import build_metadata, build_metadata_fast
+from jkmem.models import DocumentType, ObservationCategory, SourceType
+
+
+class _RecordingMemory:
+    def __init__(self) -> None:
+        self.contents = []
+
+    def add(self, messages, user_id, metadata=None, **_):
+        self.contents.extend(msg["content"] for msg in messages)
 
 
 class TestReportParser(unittest.TestCase):
@@ -35,6 +45,73 @@ Note: Normal"""
         self.assertEqual(observations[0].unit, "g/dL")
         self.assertEqual(observations[0].value_numeric, 12.3)
 
+    def test_parse_long_blank_and_padded_lines(self) -> None:
+        parser = ReportParser()
+        report_text = "\n".join(
+            [
+                " " * 20000,
+                "\t" * 20000 + ":" + " " * 20000,
+                " " * 10000 + "Glucose" + " " * 10000 + ":" + " " * 10000 + "105" + " " * 10000 + "mg/dL" + " " * 10000,
+                "Note:" + " " * 20000 + "x",
+            ]
+        )
+        _, observations = parser.parse(report_text=report_text, patient_id="patient_1")
+
+        self.assertEqual(
+            [(obs.name, obs.value, obs.unit, obs.value_numeric) for obs in observations],
+            [("Glucose", "105", "mg/dL", 105.0), ("Note", "x", None, None)],
+        )
+
+    def test_parse_and_store_writes_every_entry(self) -> None:
+        memory = _RecordingMemory()
+        service = ReportService(memory_backend=memory)
+
+        stored = service.parse_and_store(
+            user_id="user_1",
+            report_text="Hemoglobin: 12.3 g/dL\nGlucose: 105 mg/dL",
+            patient_id="patient_1",
+            document_id="doc_1",
+        )
+
+        self.assertEqual(stored, {"document_id": "doc_1", "observations": 2})
+        contents = sorted(content.split(":", 1)[0] for content in memory.contents)
+        self.assertEqual(contents, ["ReportDocument", "ReportObservation", "ReportObservation"])
+
+    def test_parse_and_store_inside_running_loop(self) -> None:
+        memory = _RecordingMemory()
+        service = ReportService(memory_backend=memory)
+
+        async def ingest():
+            synchronous = service.parse_and_store(
+                user_id="user_1",
+                report_text="Glucose: 105 mg/dL",
+                patient_id="patient_1",
+                document_id="doc_1",
+            )
+            asynchronous = await service.aparse_and_store(
+                user_id="user_1",
+                report_text="Glucose: 105 mg/dL",
+                patient_id="patient_1",
+                document_id="doc_2",
+            )
+            return synchronous, asynchronous
+
+        synchronous, asynchronous = asyncio.run(ingest())
+
+        self.assertEqual(synchronous, {"document_id": "doc_1", "observations": 1})
+        self.assertEqual(asynchronous, {"document_id": "doc_2", "observations": 1})
+        self.assertEqual(len(memory.contents), 4)
+
+    def test_fast_metadata_matches_model(self) -> None:
+        kwargs = {
+            "user_id": "user_1",
+            "patient_id": "patient_1",
+            "source_type": SourceType.REPORT,
+            "source_id": "obs_1",
+            "extra": {"encounter_type": "lab"},
+        }
+        self.assertEqual(build_metadata_fast(**kwargs), build_metadata(**kwargs))
+
 
 if __name__ == "__main__":
     unittest.main()